@@ -2,5 +2,17 @@ from app.core.settings import Settings
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 
-async_engine = create_async_engine(Settings.DATABASE_URL, echo=True)
+async_engine = create_async_engine(
+    Settings.DATABASE_URL,
+    echo=Settings.DEBUG_SQL,
+    # Room for bursts of concurrent /search requests without queueing on the pool,
+    # sized per worker process (see Settings.DATABASE_POOL_SIZE)
+    pool_size=Settings.DATABASE_POOL_SIZE,
+    max_overflow=Settings.DATABASE_MAX_OVERFLOW,
+    pool_timeout=5,
+    pool_recycle=1800,
+    pool_pre_ping=False,
+    # asyncpg prepared statements reused across requests, skips Parse on repeated queries
+    connect_args={'prepared_statement_cache_size': 1024},
+)
 AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
@@ -2,7 +2,8 @@ from app.core.constants import SCHEMA_URBIS_PARCEL_AND_BUILDING, SCHEMA_URBIS_3D
 from app.enums.building_face_type import BuildingFaceType
 from app.enums.cadastral_parcel_type import CadastralParcelType
 from datetime import date
-from sqlalchemy import SmallInteger
+from sqlalchemy import Computed, SmallInteger, Text
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from geoalchemy2 import Geometry
 
@@ -19,6 +20,14 @@ class _StreetMixin:
 
     cleaned_street_name_dutch: Mapped[str] = mapped_column()
     cleaned_street_name_french: Mapped[str] = mapped_column()
+
+    # Same separators as the address parser tokens
+    street_tokens_dutch: Mapped[list[str]] = mapped_column(
+        ARRAY(Text), Computed(r"regexp_split_to_array(cleaned_street_name_dutch, '[\s\-]+')", persisted=True),
+    )
+    street_tokens_french: Mapped[list[str]] = mapped_column(
+        ARRAY(Text), Computed(r"regexp_split_to_array(cleaned_street_name_french, '[\s\-]+')", persisted=True),
+    )
 class Street(Base, _StreetMixin):
     __tablename__ = 'street'
     __table_args__ = (
@@ -34,6 +43,9 @@ class _MunicipalityMixin:
     municipality_id: Mapped[int] = mapped_column(primary_key=True)
     municipality_name_dutch: Mapped[str] = mapped_column()
     municipality_name_french: Mapped[str] = mapped_column()
+
+    cleaned_municipality_name_dutch: Mapped[str] = mapped_column()
+    cleaned_municipality_name_french: Mapped[str] = mapped_column()
 class Municipality(Base, _MunicipalityMixin):
     __tablename__ = 'municipality'
     __table_args__ = (
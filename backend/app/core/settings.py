@@ -3,6 +3,15 @@ import os
 
 class Settings:
     DATABASE_URL = os.environ['DATABASE_URL']
+    DEBUG_SQL = os.environ.get('DEBUG_SQL', 'false').lower() in ('1', 'true')
+    # Per worker process: workers * (pool size + max overflow) must stay below PostgreSQL's max_connections
+    # (100 by default), with some room left for maintenance sessions. Defaults assume a single worker
+    DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE', '10'))
+    DATABASE_MAX_OVERFLOW = int(os.environ.get('DATABASE_MAX_OVERFLOW', '10'))
+
+    # Window during which /search requests arriving while a candidate query runs are coalesced into one (0 disables)
+    RESOLVE_BATCH_WINDOW_MS = float(os.environ.get('RESOLVE_BATCH_WINDOW_MS', '5'))
+    RESOLVE_MAX_BATCH_SIZE = int(os.environ.get('RESOLVE_MAX_BATCH_SIZE', '32'))
 
     DNS_NAME = os.environ['DNS_NAME']
 
@@ -1,7 +1,8 @@
 from app.core.constants import SCHEMA_URBIS_PARCEL_AND_BUILDING, SCHEMA_URBIS_3D_CONSTRUCTION
 from app.core.database import async_engine
-from app.core.models import Base
+from app.core.models import Base, Municipality, Street, StreetTMP
 from app.core.settings import Settings
+from app.parsers.address import candidate_batcher, refresh_cleaned_names
 from app.routers import (
     address as address_router,
     building as building_router,
@@ -11,15 +12,47 @@ from app.routers import (
 )
 from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from app.utils import fully_qualified_table_name, get_index_type
 from sqlalchemy import text
+from sqlalchemy.schema import CreateColumn
+import functools
+import ipaddress
 
 
+# create_all only creates the missing tables: the columns added to existing ones since are added at startup,
+# the cleaned names being filled in by refresh_cleaned_names (the street tokens are generated from them)
+ADDED_COLUMNS = [
+    Municipality.cleaned_municipality_name_dutch,
+    Municipality.cleaned_municipality_name_french,
+    Street.street_tokens_dutch,
+    Street.street_tokens_french,
+]
+
+def _add_column_statements(attribute) -> list[str]:
+    column = attribute.property.columns[0]
+    table = fully_qualified_table_name(attribute.class_)
+    statement = f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {CreateColumn(column).compile(dialect=async_engine.dialect)}'
+    if column.nullable or column.computed is not None:
+        return [statement]
+    # NOT NULL needs a value for the existing rows, refresh_cleaned_names replaces it right after
+    return [f"{statement} DEFAULT ''", f'ALTER TABLE {table} ALTER COLUMN {column.name} DROP DEFAULT']
+
 async def lifespan(app: FastAPI):
     async with async_engine.begin() as conn:
+        await conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
         await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS {SCHEMA_URBIS_PARCEL_AND_BUILDING}'))
         await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS {SCHEMA_URBIS_3D_CONSTRUCTION}'))
         await conn.run_sync(Base.metadata.create_all)
+        for attribute in ADDED_COLUMNS:
+            for statement in _add_column_statements(attribute):
+                await conn.execute(text(statement))
+        # The street indexes are otherwise only built by a load
+        for index_description in maintenance_router.PARCEL_AND_BUILDING_INDEXES[StreetTMP]:
+            await conn.execute(text(f'CREATE INDEX IF NOT EXISTS "{index_description.index_name(Street)}" ON {fully_qualified_table_name(Street)} {get_index_type(index_description.index_type)} ({index_description.columns_sql})'))
+        await refresh_cleaned_names(conn)
     yield
+    if candidate_batcher is not None:
+        await candidate_batcher.close()
     await async_engine.dispose()
 
 
@@ -48,13 +81,23 @@ app.include_router(urbis_3d_router.api_router, prefix='/urbis_3d', tags=['urbis_
 app.include_router(download_router.api_router, prefix='/download', tags=['download'])
 
 
-def internal_only(request: Request):
-    client_ip = request.client.host
+_INTERNAL_NETWORKS = (
+    ipaddress.ip_network("172.18.0.0/16"), # compose bridge network
+    ipaddress.ip_network("127.0.0.0/8"),
+)
 
-    if client_ip.startswith("172.18."):
-        return
+@functools.lru_cache(maxsize=256)
+def _is_internal_host(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _INTERNAL_NETWORKS)
 
-    if client_ip in ("127.0.0.1", "localhost"):
+def internal_only(request: Request):
+    if _is_internal_host(request.client.host):
         return
 
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
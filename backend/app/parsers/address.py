@@ -1,61 +1,123 @@
 
+import asyncio
+import contextlib
+import functools
 import re
 import unicodedata
+from dataclasses import dataclass, fields
 from typing import Any
 
-from sqlalchemy import func, or_, and_, select
+import numpy as np
+from rapidfuzz import process
+from rapidfuzz.distance import Indel
+from sqlalchemy import bindparam, false, func, literal, null, or_, select, union, union_all, update, Integer, Select
+from sqlalchemy.ext.asyncio import AsyncConnection
 from sqlalchemy.orm import Session
 
+from app.core.database import AsyncSessionLocal
 from app.core.models import Address, Municipality, Street
+from app.core.settings import Settings
 from app.enums.language import Language
 from app.schemas import requests, responses
 
 ACCEPT_THRESHOLD = 0.55       # minimum score to accept a single best match
 DEFAULT_CANDIDATE_LIMIT = 400 # cap DB candidate pool before Python-side scoring
 DEFAULT_TOPK = 15
+CANDIDATE_OVERSAMPLING = 3    # candidates fetched per requested result, re-scored in Python
 
 # ---------------------------
 # Normalization utilities
 # ---------------------------
 
+# Whole words only (the trailing \b): 'av' must not rewrite the start of 'avenue' nor 'pl' that of 'plantin'
 _ABBR = {
     # French / bilingual
-    re.compile(r'\bav\.?'): 'avenue',
-    re.compile(r'\bbd\.?'): 'boulevard',
-    re.compile(r'\bblvd\.?'): 'boulevard',
-    re.compile(r'\bch\.?'): 'chaussee',
+    re.compile(r'\bav\b\.?'): 'avenue',
+    re.compile(r'\bbd\b\.?'): 'boulevard',
+    re.compile(r'\bblvd\b\.?'): 'boulevard',
+    re.compile(r'\bch\b\.?'): 'chaussee',
     re.compile(r'\bchauss[ée]e\b'): 'chaussee',
     re.compile(r'\brte\b'): 'route',
-    re.compile(r'\bpl\.?'): 'place',
+    re.compile(r'\bpl\b\.?'): 'place',
     re.compile(r'\bst\b'): 'saint',
     re.compile(r'\bste\b'): 'sainte',
     # Dutch
-    re.compile(r'\b(\w+)str\.?'): r'\1straat',
-    re.compile(r'\b(\w+)ln\.?'): r'\1laan',
-    re.compile(r'\b(\w+)stwg'): r'\1steenweg',
-    re.compile(r'\b(\w+)steenw?g'): r'\1steenweg',
-    re.compile(r'\b(\w+)pl\.?'): r'\1plein',
+    re.compile(r'\b(\w+)str\b\.?'): r'\1straat',
+    re.compile(r'\b(\w+)ln\b\.?'): r'\1laan',
+    re.compile(r'\b(\w+)stwg\b'): r'\1steenweg',
+    re.compile(r'\b(\w+)steenw?g\b'): r'\1steenweg',
+    re.compile(r'\b(\w+)pl\b\.?'): r'\1plein',
 }
 
-_BOX_PATTERNS = [
+def _combine_abbreviations(abbreviations: dict[re.Pattern, str]) -> tuple[re.Pattern, dict[int, str]]:
+    """Fold the abbreviations into one alternation, keyed by group index with backreferences renumbered."""
+    alternatives = []
+    templates = {}
+    group_index = 0
+    for pat, repl in abbreviations.items():
+        group_index += 1
+        alternatives.append(f'({pat.pattern})')
+        templates[group_index] = re.sub(r'\\(\d+)', lambda m, offset=group_index: f'\\g<{offset + int(m.group(1))}>', repl)
+        group_index += pat.groups
+    return re.compile('|'.join(alternatives)), templates
+
+# Each word is scanned once; at a given position the first abbreviation listed wins
+_ABBR_PATTERN, _ABBR_TEMPLATES = _combine_abbreviations(_ABBR)
+
+_BOX_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
     r'\bbox[\.]?\s*([A-Z0-9\-]+)\b',
     r'\bbo[îi]te\s*([A-Z0-9\-]+)\b',
     r'\bbus\s*([A-Z0-9\-]+)\b',
     r'\bbte\s*([A-Z0-9\-]+)\b',
-]
+)]
 
 _WHITESPACE_PATTERN = re.compile(r'\s+')
+_POSTAL_CODE_PATTERN = re.compile(r'\b(\d{4})\b')
+_TOKEN_SEPARATOR_PATTERN = re.compile(r'[\s\-]+')
 
+@functools.lru_cache(maxsize=4096)
 def _strip_accents(s: str) -> str:
     return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
 
+@functools.lru_cache(maxsize=4096)
 def _norm(s: str) -> str:
     s0 = _strip_accents(s.lower())
-    for pat, repl in _ABBR.items():
-        s0 = pat.sub(repl, s0)
+    s0 = _ABBR_PATTERN.sub(lambda m: m.expand(_ABBR_TEMPLATES[m.lastindex]), s0)
     s0 = _WHITESPACE_PATTERN.sub(' ', s0).strip()
     return s0
 
+# Cleaned names stored next to the original ones, compared against the normalized queries
+_CLEANED_NAMES = {
+    Municipality: (Municipality.municipality_id, {
+        'cleaned_municipality_name_dutch': Municipality.municipality_name_dutch,
+        'cleaned_municipality_name_french': Municipality.municipality_name_french,
+    }),
+    Street: (Street.street_id, {
+        'cleaned_street_name_dutch': Street.street_name_dutch,
+        'cleaned_street_name_french': Street.street_name_french,
+    }),
+}
+
+async def refresh_cleaned_names(conn: AsyncConnection) -> None:
+    """
+    Recompute the cleaned municipality and street names with the current `_norm`. They are otherwise only
+    written by a load, so names loaded by an older normalization (or none at all) would not match the queries.
+    Only the rows whose cleaned names changed are updated; the street token columns follow, being generated.
+    """
+    for model, (id_column, sources) in _CLEANED_NAMES.items():
+        cleaned_columns = [getattr(model, name) for name in sources]
+        rows = await conn.execute(select(id_column, *sources.values(), *cleaned_columns))
+        changed = []
+        for row in rows:
+            cleaned = [_norm(name or '') for name in row[1:1 + len(sources)]]
+            if cleaned != list(row[1 + len(sources):]):
+                changed.append({'b_id': row[0], **{f'b_{name}': value for name, value in zip(sources, cleaned)}})
+        if changed:
+            stmt = update(model.__table__) \
+                .where(id_column == bindparam('b_id')) \
+                .values({name: bindparam(f'b_{name}') for name in sources})
+            await conn.execute(stmt, changed)
+
 def _canonical_municipality(s: str | None) -> str | None:
     if not s:
         return None
@@ -108,11 +170,11 @@ def parse_address(text: str) -> dict[str, str | None]:
         box_text = groups.get('box', '')
         if box_text:
             for pat in _BOX_PATTERNS:
-                bx = re.search(pat, box_text, flags=re.IGNORECASE)
+                bx = pat.search(box_text)
                 if bx: box = bx.group(1).upper(); break
 
     if not postal_code:
-        z = re.search(r'\b(\d{4})\b', t)
+        z = _POSTAL_CODE_PATTERN.search(t)
         if z: postal_code = z.group(1)
 
     return {'street': street or None, 'number': number or None,
@@ -128,11 +190,15 @@ def parse_address(text: str) -> dict[str, str | None]:
 # Candidate retrieval (no FTS)
 # ---------------------------
 
+@functools.lru_cache(maxsize=4096)
+def _street_tokens(street_norm: str) -> tuple[str, ...]:
+    return tuple(tok for tok in _TOKEN_SEPARATOR_PATTERN.split(street_norm) if len(tok) >= 3)
+
 def _street_token_filters(street_norm: str, language: Language) -> list[Any]:
-    """Build AND filters across distinctive tokens with ILIKE contains."""
+    """Build AND filters across distinctive tokens: whole-word containment, LIKE for the last one."""
     if not street_norm:
         return []
-    tokens = [tok for tok in re.split(r'[\s\-]+', street_norm) if len(tok) >= 3]
+    tokens = _street_tokens(street_norm)
     if not tokens:
         return []
 
@@ -147,22 +213,122 @@ def _street_token_filters(street_norm: str, language: Language) -> list[Any]:
             return or_(Street.cleaned_street_name_french.like(f"%{token}%"),
                 Street.cleaned_street_name_dutch.like(f"%{token}%"))
 
-    filters = [
-        and_(ilike(tok))
-        for tok in tokens
-    ]
+    # Every token but the last is a whole word of the street name: GIN array containment.
+    # The last one may still be being typed, so it only has to appear inside the name.
+    def contains(words):
+        if language == Language.FR:
+            return Street.street_tokens_french.contains(words)
+        elif language == Language.NL:
+            return Street.street_tokens_dutch.contains(words)
+        else:
+            return or_(Street.street_tokens_french.contains(words),
+                Street.street_tokens_dutch.contains(words))
+
+    *words, last = tokens
+    filters = [ilike(last)]
+    if words:
+        filters.append(contains(words))
     return filters
 
-async def fetch_candidates(session: Session,
-                     parsed: dict[str, str | None],
-                     language: Language,
-                     limit_each: int = DEFAULT_CANDIDATE_LIMIT) -> list[responses.AddressResult]:
+def _street_similarity(street_norm: str, language: Language) -> Any:
+    """pg_trgm similarity of the street against the cleaned name(s) of the requested language."""
+    if language == Language.FR:
+        return func.similarity(Street.cleaned_street_name_french, street_norm)
+    elif language == Language.NL:
+        return func.similarity(Street.cleaned_street_name_dutch, street_norm)
+    else:
+        return func.greatest(func.similarity(Street.cleaned_street_name_french, street_norm),
+            func.similarity(Street.cleaned_street_name_dutch, street_norm))
+
+# Only what AddressResult needs: whole entities would also ship both geometries of every row
+_ADDRESS_RESULT_COLUMNS = (
+    Address.id,
+    Address.address_id,
+    Street.street_name_dutch,
+    Street.street_name_french,
+    Address.police_number,
+    Address.box_number,
+    Address.postal_code,
+    Municipality.municipality_name_dutch,
+    Municipality.municipality_name_french,
+    Address.building_id,
+)
+
+def _to_address_result(row) -> responses.AddressResult:
+    return responses.AddressResult(
+        id=row.id,
+        address_id=row.address_id,
+        street_name_dutch=row.street_name_dutch,
+        street_name_french=row.street_name_french,
+        police_number=row.police_number,
+        box_number=row.box_number,
+        postal_code=row.postal_code,
+        municipality_name_dutch=row.municipality_name_dutch,
+        municipality_name_french=row.municipality_name_french,
+        building_id=row.building_id
+    )
+
+@dataclass
+class AddressResultBatch:
+    """
+    Candidate rows kept column-wise, one tuple per AddressResult field: scoring reads whole columns, and
+    AddressResult objects are only built (on indexing) for the few rows that end up in the response.
+    """
+    id: tuple[int, ...]
+    address_id: tuple[int, ...]
+    street_name_dutch: tuple[str | None, ...]
+    street_name_french: tuple[str | None, ...]
+    police_number: tuple[str, ...]
+    box_number: tuple[str | None, ...]
+    postal_code: tuple[int, ...]
+    municipality_name_dutch: tuple[str | None, ...]
+    municipality_name_french: tuple[str | None, ...]
+    building_id: tuple[int | None, ...]
+
+    @classmethod
+    def from_rows(cls, rows: list) -> 'AddressResultBatch':
+        """Columns picked by name from rows carrying (at least) the `_ADDRESS_RESULT_COLUMNS`."""
+        if not rows:
+            return cls(*([()] * len(fields(cls))))
+        columns = dict(zip(rows[0]._fields, zip(*rows)))
+        return cls(**{field.name: columns[field.name] for field in fields(cls)})
+
+    @classmethod
+    def from_results(cls, results: list[responses.AddressResult]) -> 'AddressResultBatch':
+        return cls(**{field.name: tuple(getattr(result, field.name) for result in results) for field in fields(cls)})
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def __getitem__(self, i: int) -> responses.AddressResult:
+        return responses.AddressResult(
+            id=self.id[i],
+            address_id=self.address_id[i],
+            street_name_dutch=self.street_name_dutch[i],
+            street_name_french=self.street_name_french[i],
+            police_number=self.police_number[i],
+            box_number=self.box_number[i],
+            postal_code=self.postal_code[i],
+            municipality_name_dutch=self.municipality_name_dutch[i],
+            municipality_name_french=self.municipality_name_french[i],
+            building_id=self.building_id[i]
+        )
+
+def _candidate_ids_query(parsed: dict[str, str | None],
+                         language: Language,
+                         limit_each: int,
+                         batch_index: int = 0) -> Select:
     """
-    Gather candidate rows using only LIKE/ILIKE-compatible expressions:
+    Ids of the candidate rows using only LIKE/ILIKE-compatible expressions:
     - street tokens (FR or NL)
     - optional postal_code
     - optional police_number (exact or prefix)
     - optional box_number
+    Rows are ordered by pg_trgm street similarity so only the best `limit_each` are kept.
+
+    The addresses of the most similar candidate's building are added speculatively
+    (with a NULL similarity), as it is usually the one `best_match` ends up picking.
+    Every row is tagged with `batch_index` so several requests can share one statement.
     """
     street = parsed['street'] or ""
     postal_code = parsed['postal_code']
@@ -173,7 +339,13 @@ async def fetch_candidates(session: Session,
     if all(map(lambda x: x is None, [postal_code, municipality, number, box])) and (street is None or street == ''):
         street = parsed['query']
 
-    street_join = select(Address, Street, Municipality) \
+    similarity = _street_similarity(street, language) if street else literal(0.0)
+    # The street similarity ties on every address of a street: the exact number comes first, so that the
+    # limit never cuts the candidate score_candidates rewards the most (the LIKE below only checks a prefix)
+    ranking = [similarity.label('similarity')]
+    if number:
+        ranking.append((func.lower(Address.police_number) == number.lower()).label('exact_number'))
+    street_join = select(Address.id, Address.building_id, *ranking) \
         .join(Street, Street.street_id == Address.street_id) \
         .join(Municipality, Municipality.municipality_id == Address.municipality_id)
     if number:
@@ -194,142 +366,273 @@ async def fetch_candidates(session: Session,
             street_join = street_join.where(f)
 
     if municipality:
-        c = _norm(municipality)
+        # Already canonical (see parse_address), compared against the names normalized at load time
         if language == Language.FR:
-            street_join = street_join.where(func.lower(Municipality.municipality_name_french) == c)
+            street_join = street_join.where(Municipality.cleaned_municipality_name_french == municipality)
         elif language == Language.NL:
-            street_join = street_join.where(func.lower(Municipality.municipality_name_dutch) == c)
+            street_join = street_join.where(Municipality.cleaned_municipality_name_dutch == municipality)
         else:
             street_join = street_join.where(or_(
-                func.lower(Municipality.municipality_name_french) == c,
-                func.lower(Municipality.municipality_name_dutch)  == c
+                Municipality.cleaned_municipality_name_french == municipality,
+                Municipality.cleaned_municipality_name_dutch  == municipality
             ))
 
-    # Combine clauses: we’ll execute two passes—tight and relaxed
-    results: list[responses.AddressResult] = []
-
-    async def run(q):
-        q = q.limit(limit_each)
-        result = await session.execute(q)
-        for row in result:
-            # Row tuple: (Address, Street, Municipality)
-            a: Address = row[0]
-            s: Street  = row[1]
-            m: Municipality = row[2]
-            results.append(responses.AddressResult(
-                id=a.id,
-                address_id=a.address_id,
-                street_name_dutch=s.street_name_dutch,
-                street_name_french=s.street_name_french,
-                police_number=a.police_number,
-                box_number=a.box_number,
-                postal_code=a.postal_code,
-                municipality_name_dutch=m.municipality_name_dutch,
-                municipality_name_french=m.municipality_name_french,
-                building_id=a.building_id
-            ))
+    candidate = street_join.order_by(*[column.element.desc() for column in ranking], Address.id).limit(limit_each).cte(f'candidate_{batch_index}')
+    top_building_id = select(candidate.c.building_id) \
+        .order_by(*[candidate.c[column.name].desc() for column in ranking], candidate.c.id) \
+        .limit(1) \
+        .scalar_subquery()
+    address_ids = union(
+        select(candidate.c.id),
+        select(Address.id).where(Address.building_id == top_building_id),
+    ).subquery(f'address_ids_{batch_index}')
+
+    return select(literal(batch_index, Integer).label('batch_index'), address_ids.c.id, candidate.c.similarity) \
+        .select_from(address_ids) \
+        .outerjoin(candidate, candidate.c.id == address_ids.c.id)
+
+def _candidate_rows_query(candidate_ids_queries: list[Select]) -> Select:
+    """Join the tagged candidate ids back to their rows, grouped by batch index and ordered by similarity."""
+    batched = union_all(*candidate_ids_queries).subquery('batched')
+    return select(batched.c.batch_index, *_ADDRESS_RESULT_COLUMNS, batched.c.similarity) \
+        .join(Address, Address.id == batched.c.id) \
+        .join(Street, Street.street_id == Address.street_id) \
+        .join(Municipality, Municipality.municipality_id == Address.municipality_id) \
+        .order_by(batched.c.batch_index, batched.c.similarity.desc().nulls_last(), Address.id)
+
+def _padding_query() -> Select:
+    """Never returns a row, but has the columns of `_candidate_ids_query`: pads a batch up to its bucket size."""
+    return select(literal(-1, Integer).label('batch_index'), Address.id, null().label('similarity')).where(false())
 
-    # Pass 1: street_join with current constraints
-    await run(street_join)
+def _bucket_size(size: int, max_batch_size: int) -> int:
+    # Next power of two (but no more than the largest batch)
+    return min(1 << (size - 1).bit_length(), max(size, max_batch_size))
 
-    return results
+def _split_candidate_rows(rows) -> tuple[AddressResultBatch, list[responses.AddressResult]]:
+    # similarity is NULL for building-only rows
+    candidates = AddressResultBatch.from_rows([row for row in rows if row.similarity is not None])
+    if not candidates or candidates.building_id[0] is None:
+        return candidates, []
+    building_id = candidates.building_id[0]
+    return candidates, [_to_address_result(row) for row in rows if row.building_id == building_id]
+
+async def fetch_candidates(session: Session,
+                     parsed: dict[str, str | None],
+                     language: Language,
+                     limit_each: int = DEFAULT_CANDIDATE_LIMIT) -> tuple[AddressResultBatch, list[responses.AddressResult]]:
+    """
+    Gather the candidates of a single request (see `_candidate_ids_query`).
+
+    Returns:
+        (candidates, addresses of the most similar candidate's building)
+    """
+    q = _candidate_rows_query([_candidate_ids_query(parsed, language, limit_each)])
+    return _split_candidate_rows(await session.execute(q))
+
+class CandidateBatcher:
+    """
+    Coalesces concurrent `fetch_candidates` calls into one UNION ALL round trip.
+
+    A request arriving while no batch is running is sent right away (along with
+    whatever is already queued). While one is running, requests arriving within
+    `batch_window_ms` of the first pending one (at most `max_batch_size` of them)
+    are executed as a single statement on a session of their own, then
+    demultiplexed on their batch index.
+
+    Each running batch holds a pooled connection: at most `max_running_batches`
+    run at once, the requests arriving meanwhile wait in the queue (and end up
+    in larger batches) rather than on the pool.
+
+    Batches are padded to a power of two branches, which bounds how many
+    statement texts come from the batch size alone. The text of each branch
+    still depends on the filters of its request, so batches mixing different
+    kinds of queries keep producing new statements.
+    """
+
+    def __init__(self, session_factory, batch_window_ms: float, max_batch_size: int, max_running_batches: int):
+        self.session_factory = session_factory
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.running_slots = asyncio.Semaphore(max_running_batches)
+        self.queue: asyncio.Queue | None = None
+        self.worker: asyncio.Task | None = None
+        self.running: set[asyncio.Task] = set()
+
+    async def fetch(self,
+                    parsed: dict[str, str | None],
+                    language: Language,
+                    limit_each: int = DEFAULT_CANDIDATE_LIMIT) -> tuple[AddressResultBatch, list[responses.AddressResult]]:
+        if self.worker is None:
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self._collect())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((parsed, language, limit_each, future))
+        return await future
+
+    async def close(self):
+        if self.worker is None:
+            return
+        self.worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self.worker
+        self.worker = None
+        await asyncio.gather(*self.running, return_exceptions=True)
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            # Only worth waiting for more requests when a query is already running
+            deadline = loop.time() + (self.batch_window if self.running else 0)
+            while len(pending) < self.max_batch_size:
+                if not self.queue.empty():
+                    pending.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Wait for a free connection slot, topping up the batch with what queued meanwhile
+            await self.running_slots.acquire()
+            while len(pending) < self.max_batch_size and not self.queue.empty():
+                pending.append(self.queue.get_nowait())
+
+            # Executed in the background so the next batch is gathered meanwhile
+            task = asyncio.create_task(self._execute(pending))
+            self.running.add(task)
+            task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task):
+        self.running.discard(task)
+        self.running_slots.release()
+
+    async def _execute(self, pending: list[tuple]):
+        # Requests whose client went away are not worth querying
+        pending = [request for request in pending if not request[-1].done()]
+        if not pending:
+            return
+
+        try:
+            candidate_ids_queries = [
+                _candidate_ids_query(parsed, language, limit_each, batch_index)
+                for batch_index, (parsed, language, limit_each, _) in enumerate(pending)
+            ]
+            padding = _bucket_size(len(pending), self.max_batch_size) - len(pending)
+            q = _candidate_rows_query(candidate_ids_queries + [_padding_query()] * padding)
+            rows_per_request = [[] for _ in pending]
+            async with self.session_factory() as session:
+                for row in await session.execute(q):
+                    rows_per_request[row.batch_index].append(row)
+        except Exception as e:
+            for *_, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (*_, future), rows in zip(pending, rows_per_request):
+            if not future.done():
+                future.set_result(_split_candidate_rows(rows))
+
+# Disabled with RESOLVE_BATCH_WINDOW_MS=0, candidates are then fetched on the request's own session
+# Half of the pool at most for the batches, the request sessions need connections too
+candidate_batcher = CandidateBatcher(AsyncSessionLocal, Settings.RESOLVE_BATCH_WINDOW_MS, Settings.RESOLVE_MAX_BATCH_SIZE, max(1, Settings.DATABASE_POOL_SIZE // 2)) \
+    if Settings.RESOLVE_BATCH_WINDOW_MS > 0 else None
 
 # ---------------------------
-# Fuzzy scoring (Python only)
+# Fuzzy scoring (Python only, vectorized over candidates)
 # ---------------------------
 
-def _sequence_ratio(a: str, b: str) -> float:
-    # difflib is light-weight and sufficient for short street names
-    import difflib
-    return difflib.SequenceMatcher(None, _norm(a), _norm(b)).ratio()
-
+@functools.lru_cache(maxsize=2048)
 def _leading_int(s: str) -> int | None:
-    m = re.match(r'^\d+', s or '')
-    return int(m.group(0)) if m else None
-
-def score_candidate(c: responses.AddressResult, parsed: dict[str, str | None]) -> float:
+    if not s:
+        return None
+    # isdecimal matches what \d accepts (isdigit would let '²' through to int())
+    i = 0
+    while i < len(s) and s[i].isdecimal():
+        i += 1
+    return int(s[:i]) if i else None
+
+def score_candidates(cands: AddressResultBatch | list[responses.AddressResult], parsed: dict[str, str | None]) -> np.ndarray:
+    """Score every candidate at once, one column per field, returning one score per candidate."""
+    if not isinstance(cands, AddressResultBatch):
+        cands = AddressResultBatch.from_results(cands)
     street  = parsed['street']
     municipality = parsed['municipality']
     postal_code = parsed['postal_code']
     number  = parsed['number']
     box     = parsed['box']
 
-    score = 0.0
+    n = len(cands)
+    scores = np.zeros(n)
 
-    # Street similarity (FR/NL)
+    # Street similarity (FR/NL), both languages scored in a single cdist call
     if street:
-        sim = max(
-            _sequence_ratio(street, c.street_name_french or ''),
-            _sequence_ratio(street, c.street_name_dutch  or '')
-        )
-        score += 0.55 * sim
+        street_names = [_norm(name or '') for name in cands.street_name_french] + [_norm(name or '') for name in cands.street_name_dutch]
+        sim = process.cdist([_norm(street)], street_names, scorer=Indel.normalized_similarity, dtype=np.float64)[0]
+        scores += 0.55 * np.maximum(sim[:n], sim[n:])
 
     # Municipality exact match bonus
     if municipality:
-        if _canonical_municipality(c.municipality_name_french) == municipality or \
-           _canonical_municipality(c.municipality_name_dutch)  == municipality:
-            score += 0.15
+        scores += 0.15 * np.fromiter((
+            _canonical_municipality(name_french) == municipality or
+            _canonical_municipality(name_dutch)  == municipality
+            for name_french, name_dutch in zip(cands.municipality_name_french, cands.municipality_name_dutch)), dtype=bool, count=n)
 
     # ZIP exact match bonus
-    if postal_code and str(c.postal_code) == postal_code:
-        score += 0.10
+    if postal_code:
+        scores += 0.10 * (np.fromiter(cands.postal_code, dtype=np.int64, count=n) == int(postal_code))
 
     # Police number exact / proximity
-    if number and c.police_number:
-        if number.strip().lower() == c.police_number.strip().lower():
-            score += 0.15
-        else:
-            a = _leading_int(number)
-            b = _leading_int(c.police_number)
-            if a is not None and b is not None:
-                d = abs(a - b)
-                if d == 1: score += 0.05
-                elif d <= 3: score += 0.03
+    if number:
+        number_lc = number.strip().lower()
+        exact = np.fromiter((police_number and police_number.strip().lower() == number_lc
+                             for police_number in cands.police_number), dtype=bool, count=n)
+        scores += 0.15 * exact
+        a = _leading_int(number)
+        if a is not None:
+            b = np.array([_leading_int(police_number) for police_number in cands.police_number], dtype=np.float64)
+            d = np.abs(b - a) # None became NaN, which never matches below
+            scores += np.where(exact, 0.0, np.where(d == 1, 0.05, np.where(d <= 3, 0.03, 0.0)))
 
     # Box exact bonus
-    if box and c.box_number and box.strip().lower() == c.box_number.strip().lower():
-        score += 0.05
+    if box:
+        box_lc = box.strip().lower()
+        scores += 0.05 * np.fromiter((box_number and box_number.strip().lower() == box_lc
+                                      for box_number in cands.box_number), dtype=bool, count=n)
 
-    return score
+    return scores
 
-def best_match(cands: list[responses.AddressResult], parsed: dict[str, str | None], threshold: float = ACCEPT_THRESHOLD) -> responses.AddressResult | None:
+def best_match(cands: AddressResultBatch | list[responses.AddressResult], parsed: dict[str, str | None], threshold: float = ACCEPT_THRESHOLD, scores: np.ndarray | None = None) -> responses.AddressResult | None:
     if not cands:
         return None
-    scored = sorted(((c, score_candidate(c, parsed)) for c in cands), key=lambda x: x[1], reverse=True)
-    cand, sc = scored[0]
-    return cand if sc >= threshold else None
+    if scores is None:
+        scores = score_candidates(cands, parsed)
+    best = int(np.argmax(scores))
+    return cands[best] if scores[best] >= threshold else None
 
-def rank_similar(cands: list[responses.AddressResult], parsed: dict[str, str | None], topk: int = DEFAULT_TOPK) -> list[responses.AddressResult]:
-    scored = sorted(((c, score_candidate(c, parsed)) for c in cands), key=lambda x: x[1], reverse=True)
-    return [c for c, s in scored[:topk]]
+def rank_similar(cands: AddressResultBatch | list[responses.AddressResult], parsed: dict[str, str | None], topk: int = DEFAULT_TOPK, scores: np.ndarray | None = None) -> list[responses.AddressResult]:
+    if not cands:
+        return []
+    if scores is None:
+        scores = score_candidates(cands, parsed)
+    return [cands[i] for i in np.argsort(-scores, kind='stable')[:topk]]
 
 # ---------------------------
 # Building fetch (group by BU_ID / building_id)
 # ---------------------------
 
 async def fetch_building(session: Session, building_id: int) -> list[responses.AddressResult]:
-    q = select(Address, Street, Municipality) \
+    q = select(*_ADDRESS_RESULT_COLUMNS) \
         .join(Street, Street.street_id == Address.street_id) \
         .join(Municipality, Municipality.municipality_id == Address.municipality_id) \
         .where(Address.building_id == building_id)
 
-    out: list[responses.AddressResult] = []
     result = await session.execute(q)
-    for row in result:
-        a: Address = row[0]; s: Street = row[1]; m: Municipality = row[2]
-        out.append(responses.AddressResult(
-            id=a.id,
-            address_id=a.address_id,
-            street_name_dutch=s.street_name_dutch,
-            street_name_french=s.street_name_french,
-            police_number=a.police_number,
-            box_number=a.box_number,
-            postal_code=a.postal_code,
-            municipality_name_dutch=m.municipality_name_dutch,
-            municipality_name_french=m.municipality_name_french,
-            building_id=a.building_id
-        ))
-    return out
+    return [_to_address_result(row) for row in result]
 
 # ---------------------------
 # Public API
@@ -345,15 +648,24 @@ async def resolve(session: Session, search_address: requests.SearchAddress) -> r
     """
     parsed = parse_address(search_address.free_text)
 
-    candidates = await fetch_candidates(session, parsed, language=search_address.language, limit_each=DEFAULT_CANDIDATE_LIMIT)
+    limit_each = min(DEFAULT_CANDIDATE_LIMIT, max(search_address.top_k, DEFAULT_TOPK) * CANDIDATE_OVERSAMPLING)
+    if candidate_batcher is not None:
+        candidates, speculative_building = await candidate_batcher.fetch(parsed, language=search_address.language, limit_each=limit_each)
+    else:
+        candidates, speculative_building = await fetch_candidates(session, parsed, language=search_address.language, limit_each=limit_each)
 
-    match = best_match(candidates, parsed, threshold=ACCEPT_THRESHOLD)
+    # Scored once, shared by best_match and the rank_similar fallback
+    scores = score_candidates(candidates, parsed)
+    match = best_match(candidates, parsed, threshold=ACCEPT_THRESHOLD, scores=scores)
     building = []
     similar = []
 
     if match and match.building_id is not None:
-        building = await fetch_building(session, match.building_id)
+        if speculative_building and speculative_building[0].building_id == match.building_id:
+            building = speculative_building
+        else:
+            building = await fetch_building(session, match.building_id)
     else:
-        similar = rank_similar(candidates, parsed, topk=search_address.top_k)
+        similar = rank_similar(candidates, parsed, topk=search_address.top_k, scores=scores)
 
     return responses.ResolveResult(query=parsed, match=match, building=building, similar=similar)
@@ -2,29 +2,39 @@ from app.core.constants import WGS_84_SRID
 from app.core.settings import Settings
 from app.utils import transform_geometry
 from shapely import wkt, Polygon
+import asyncio
 import os
 
 
-def read_forbidden_areas_polygons(destination_srid: int) -> list[Polygon]:
+async def read_forbidden_areas_polygons(destination_srid: int) -> list[Polygon]:
     folder_path = Settings.FORBIDDEN_AREAS_FOLDER
 
-    polygons = []
+    file_paths = []
     for filename in os.listdir(folder_path):
         print(f'Forbidden area: {filename}')
         if filename.lower().endswith(".wkt"):
-            file_path = os.path.join(folder_path, filename)
-
-            with open(file_path, "r") as f:
-                wkt_text = f.read().strip()
-
-            geom = wkt.loads(wkt_text)
-
-            if geom.geom_type == "Polygon":
-                polygons.append(transform_geometry(geom, source_srid=WGS_84_SRID, dest_srid=destination_srid))
-            else:
-                print(f"Skipping {filename}: geometry is {geom.geom_type}")
+            file_paths.append(os.path.join(folder_path, filename))
         else:
             print(f"Skipping {filename}")
 
+    # Parsing and reprojection are independent per file, run them off the event loop
+    geometries = await asyncio.gather(*(
+        asyncio.to_thread(read_forbidden_area_polygon, file_path, destination_srid)
+        for file_path in file_paths
+    ))
+    polygons = [geometry for geometry in geometries if geometry is not None]
+
     print(f'Found: {len(polygons)} forbidden areas')
     return polygons
+
+def read_forbidden_area_polygon(file_path: str, destination_srid: int) -> Polygon | None:
+    with open(file_path, "r") as f:
+        wkt_text = f.read().strip()
+
+    geom = wkt.loads(wkt_text)
+
+    if geom.geom_type != "Polygon":
+        print(f"Skipping {os.path.basename(file_path)}: geometry is {geom.geom_type}")
+        return None
+
+    return transform_geometry(geom, source_srid=WGS_84_SRID, dest_srid=destination_srid)
@@ -0,0 +1,15 @@
+# Full-table scans of the GeoPackages: large page cache and mmap, and no writes ever go through these engines.
+# The default locking mode is kept, each engine pools two connections that may read at the same time
+GPKG_READ_PRAGMAS = '''
+PRAGMA cache_size=-200000;
+PRAGMA mmap_size=5368709120;
+PRAGMA temp_store=MEMORY;
+PRAGMA synchronous=OFF;
+PRAGMA query_only=1;
+'''
+
+def tune_gpkg_connection(dbapi_conn, *args):
+    # Must be listened after load_spatialite_gpkg, which may still create the GeoPackage metadata tables
+    cursor = dbapi_conn.cursor()
+    cursor.executescript(GPKG_READ_PRAGMAS)
+    cursor.close()
@@ -1,16 +1,33 @@
-from app.core.models import BuildingFace, BuildingSolid
+from app.core.models import BuildingSolid
 from app.core.settings import Settings
 from app.enums.building_face_type import BuildingFaceType
 from app.enums.inspire_base_uri import InspireBaseURI
+from app.parsers.geopackage import tune_gpkg_connection
 from sqlalchemy import create_engine, select, Date, Integer, String
 from sqlalchemy.event import listen
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import Session, DeclarativeBase, Mapped, mapped_column
 from geoalchemy2 import Geometry, load_spatialite_gpkg
-from shapely import wkb
-
-
-engine = create_engine(f"gpkg:///{Settings.URBIS_3D_CONSTRUCTION_GEO_PACKAGE_PATH}", echo=False)
+import shapely
+
+
+GROUND_SURFACE_BATCH_SIZE = 10_000
+# Order of the tuples yielded by read_building_faces, as copied into BuildingFaceTMP
+BUILDING_FACE_COLUMNS = ['id', 'building_face_id', 'geometry', 'building_solid_id', 'type', 'details_level', 'begin_validity', 'end_validity']
+
+# A couple of long-lived connections, reused by every full-table scan of a load: SpatiaLite
+# is initialized once per connection and its page cache/mmap stay warm between scans
+engine = create_engine(
+    f"gpkg:///{Settings.URBIS_3D_CONSTRUCTION_GEO_PACKAGE_PATH}",
+    echo=False,
+    poolclass=QueuePool,
+    pool_size=2,
+    max_overflow=0,
+    pool_recycle=-1,
+    pool_pre_ping=False,
+)
 listen(engine, "connect", load_spatialite_gpkg)
+listen(engine, "connect", tune_gpkg_connection)
 
 
 class Base(DeclarativeBase):
@@ -32,37 +49,62 @@ class GPKGBuildingFace(Base):
 
 def read_building_faces(building_solid_map: dict[int, BuildingSolid]):
     i = 0
+    ground_surfaces: list[tuple[int, bytes]] = []
     with Session(engine) as session:
-        stmt = select(GPKGBuildingFace)
-        results = session.execute(stmt).yield_per(1000).scalars()
-
-        for gpkg_building_face in results:
-            building_solid = read_building_solid(building_solid_map, gpkg_building_face.building_solid_id)
+        # Plain column rows: no ORM instance, identity map entry or attribute state per face
+        stmt = select(
+            GPKGBuildingFace.id,
+            GPKGBuildingFace.inspire_id,
+            GPKGBuildingFace.geometry,
+            GPKGBuildingFace.building_solid_id,
+            GPKGBuildingFace.type,
+            GPKGBuildingFace.details_level,
+            GPKGBuildingFace.begin_life,
+            GPKGBuildingFace.end_life,
+        )
+        results = session.execute(stmt).yield_per(5000)
+
+        for face_id, inspire_id, geometry, building_solid_uri, face_type, details_level, begin_life, end_life in results:
+            building_solid = read_building_solid(building_solid_map, building_solid_uri)
 
             #if i > 10_000:
             #    break
 
-            building_face = BuildingFace(
-                id=gpkg_building_face.id,
-                building_face_id=read_inspire_id(gpkg_building_face.inspire_id, InspireBaseURI.BUILDING_FACE),
-                geometry=gpkg_building_face.geometry,
-                building_solid_id=building_solid.building_solid_id,
-                type=BuildingFaceType[gpkg_building_face.type],
-                details_level=gpkg_building_face.details_level,
-                begin_validity=gpkg_building_face.begin_life,
-                end_validity=gpkg_building_face.end_life,
+            building_face_type = BuildingFaceType[face_type]
+            # SpatiaLite returns AsEWKB as hex text, binary COPY needs the raw EWKB bytes
+            geometry_wkb = bytes.fromhex(geometry.data)
+
+            # If GroundSurface, set centroid on BuildingSolid (decoded in batches)
+            if building_face_type == BuildingFaceType.GROUNDSURFACE:
+                ground_surfaces.append((building_solid.building_solid_id, geometry_wkb))
+                if len(ground_surfaces) >= GROUND_SURFACE_BATCH_SIZE:
+                    set_ground_centroids(building_solid_map, ground_surfaces)
+                    ground_surfaces.clear()
+
+            # Plain tuple in BUILDING_FACE_COLUMNS order, copied as is (binary COPY)
+            yield (
+                face_id,
+                read_building_face_id(inspire_id),
+                geometry_wkb,
+                building_solid.building_solid_id,
+                building_face_type.value,
+                details_level,
+                begin_life,
+                end_life,
             )
+            i += 1
 
-            # If GroundSurface, set centroid on BuildingSolid
-            if building_face.type == BuildingFaceType.GROUNDSURFACE:
-                shape = wkb.loads(building_face.geometry.data)
-                building_solid_map[building_solid.building_solid_id].geometry = shape.centroid
+    set_ground_centroids(building_solid_map, ground_surfaces)
 
-            yield building_face
-            i += 1
+def set_ground_centroids(building_solid_map: dict[int, BuildingSolid], ground_surfaces: list[tuple[int, bytes]]):
+    if not ground_surfaces:
+        return
+    centroids = shapely.centroid(shapely.from_wkb([data for _, data in ground_surfaces]))
+    for (building_solid_id, _), centroid in zip(ground_surfaces, centroids):
+        building_solid_map[building_solid_id].geometry = centroid
 
 def read_building_solid(building_solid_map: dict[int, BuildingSolid], building_solid_id) -> BuildingSolid:
-    building_id = read_inspire_id(building_solid_id, InspireBaseURI.BUILDING_SOLID)
+    building_id = read_building_solid_id(building_solid_id)
     building_solid = building_solid_map.get(building_id)
     if building_solid is not None:
         return building_solid
@@ -74,6 +116,12 @@ def read_building_solid(building_solid_map: dict[int, BuildingSolid], building_s
     building_solid_map[building_id] = building_solid
     return building_solid
 
-def read_inspire_id(uri: str, uri_base: InspireBaseURI) -> int:
-    id_part = uri.removeprefix(uri_base.value)
-    return int(id_part)
+# INSPIRE ids are the integer after a fixed base URI, sliced off by its precomputed length
+_BUILDING_FACE_PREFIX_LENGTH = len(InspireBaseURI.BUILDING_FACE.value)
+_BUILDING_SOLID_PREFIX_LENGTH = len(InspireBaseURI.BUILDING_SOLID.value)
+
+def read_building_face_id(uri: str) -> int:
+    return int(uri[_BUILDING_FACE_PREFIX_LENGTH:])
+
+def read_building_solid_id(uri: str) -> int:
+    return int(uri[_BUILDING_SOLID_PREFIX_LENGTH:])
@@ -1,21 +1,34 @@
 from app.core.constants import LAMBERT_72_SRID, LAMBERT_08_SRID
-from app.core.models import Address, Building, CadastralParcel, Municipality, Street
+from app.core.models import Municipality, Street
 from app.core.settings import Settings
 from app.enums.cadastral_parcel_type import CadastralParcelType
 from app.enums.inspire_base_uri import InspireBaseURI
 from app.parsers.address import _norm
-from pyproj import Transformer
-from shapely.geometry import Point
+from app.parsers.geopackage import tune_gpkg_connection
+from app.utils import get_transformer
 from sqlalchemy import create_engine, select, Float, Integer, REAL, String
 from sqlalchemy.event import listen
-from sqlalchemy.orm import Session, DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from geoalchemy2 import Geometry, load_spatialite_gpkg
-from geoalchemy2.shape import from_shape
 from typing import Iterator
-
-
-engine = create_engine(f"gpkg:///{Settings.URBIS_PARCEL_BUILDING_GEO_PACKAGE_PATH}", echo=False)
+import binascii
+import struct
+
+
+# A couple of long-lived connections, reused by every full-table scan of a load: SpatiaLite
+# is initialized once per connection and its page cache/mmap stay warm between scans
+engine = create_engine(
+    f"gpkg:///{Settings.URBIS_PARCEL_BUILDING_GEO_PACKAGE_PATH}",
+    echo=False,
+    poolclass=QueuePool,
+    pool_size=2,
+    max_overflow=0,
+    pool_recycle=-1,
+    pool_pre_ping=False,
+)
 listen(engine, "connect", load_spatialite_gpkg)
+listen(engine, "connect", tune_gpkg_connection)
 
 
 class Base(DeclarativeBase):
@@ -68,120 +81,215 @@ class GPKGCadastralParcel(Base):
 
 MAX = None#10_000
 
-def is_null_or_whitespace(value: str | None) -> bool:
-    return value is None or value.strip() == ''
+SLASH = ord('/')
 
-def is_valid_inspire_id(value: str | None) -> bool:
-    if is_null_or_whitespace(value):
-        return False
-    return not value.endswith('/')
+def is_valid_inspire_id(value: bytes | None) -> bool:
+    # Unset when NULL, blank or a bare base URI (ending with '/'), cheapest tests first
+    return bool(value) and value[-1] != SLASH and not value.isspace()
 
-TO_L08_FROM_L72 = Transformer.from_crs(LAMBERT_72_SRID, LAMBERT_08_SRID, always_xy=True)
-def force_to_lambert_08(x, y):
-    if 100000 <= x <= 300000 and 150000 <= y <= 250000:
-        x, y = TO_L08_FROM_L72.transform(x, y)
+def decode(value: bytes | None) -> str | None:
+    return value.decode() if value is not None else None
 
-    return Point(x, y)
+def read_geometry(value: str | bytes | None) -> bytes | None:
+    """SpatiaLite returns AsEWKB as hex text, binary COPY needs the raw EWKB bytes."""
+    return binascii.unhexlify(value) if value is not None else None
 
-def read_addresses(capa_key_to_capa_inspire_id: dict[str, int], municipalities: dict[int, Municipality], streets: dict[int, Street]) -> Iterator[Address]:
-    i = 0
-    with Session(engine) as session:
-        stmt = select(GPKGAddress)
-        results = session.execute(stmt).yield_per(1000).scalars()
+TO_L08_FROM_L72 = get_transformer(LAMBERT_72_SRID, LAMBERT_08_SRID)
+# Little-endian EWKB point with SRID: byte order, type (Point | SRID flag), SRID, x, y
+EWKB_POINT = struct.Struct('<BIIdd')
+EWKB_POINT_WITH_SRID = 0x20000001
 
-        for gpkg_address in results:
-            if MAX is not None and i > MAX:
-                break
+def lambert_08_point(x, y) -> bytes:
+    """Point in Lambert 2008 as EWKB, packed directly instead of going through a Shapely Point per row."""
+    if 100000 <= x <= 300000 and 150000 <= y <= 250000:
+        x, y = TO_L08_FROM_L72.transform(x, y)
 
-            municipality_id = read_inspire_id(gpkg_address.munnis_code, InspireBaseURI.MUNICIPALITY)
+    return EWKB_POINT.pack(1, EWKB_POINT_WITH_SRID, LAMBERT_08_SRID, x, y)
+
+ROW_BATCH_SIZE = 10_000
+
+# Order of the tuples yielded by the read_* functions, as copied into their TMP table
+ADDRESS_COLUMNS = ['id', 'address_id', 'street_id', 'municipality_id', 'parent_id', 'cadastral_parcel_id', 'building_id', 'carto_angle', 'postal_code', 'police_number', 'box_number', 'stat_nis_code', 'l08', 'geometry']
+BUILDING_COLUMNS = ['id', 'building_id', 'block_id', 'area', 'geometry']
+CADASTRAL_PARCEL_COLUMNS = ['id', 'cadastral_parcel_id', 'cadastral_division', 'municipality_id', 'area', 'type', 'cadastral_parcel_key', 'geometry']
+
+def iter_rows(stmt) -> Iterator[tuple]:
+    """
+    Rows of `stmt` as plain tuples straight from the DB-API cursor: no ORM instance, identity map or Row per row.
+    The statement is still compiled from the GPKG models, so geometries come back as SpatiaLite's hex EWKB.
+
+    Text columns come back as undecoded bytes: most of them are only sliced and parsed as integers,
+    the few that are stored as text are decoded by the caller. The hex EWKB is text as well, so it comes
+    back as ASCII bytes and must go through `read_geometry` before being copied.
+    """
+    sql = str(stmt.compile(engine))
+    connection = engine.raw_connection()
+    driver_connection = connection.driver_connection
+    try:
+        driver_connection.text_factory = bytes
+        cursor = connection.cursor()
+        cursor.execute(sql)
+        while rows := cursor.fetchmany(ROW_BATCH_SIZE):
+            yield from rows
+    finally:
+        # The connection goes back to the pool, SQLAlchemy and SpatiaLite expect str there
+        driver_connection.text_factory = str
+        connection.close()
+
+def read_addresses(capa_key_to_capa_inspire_id: dict[bytes, int], municipalities: dict[int, Municipality], streets: dict[int, Street]) -> Iterator[tuple]:
+    i = 0
+    stmt = select(
+        GPKGAddress.id,
+        GPKGAddress.geom,
+        GPKGAddress.inspire_id,
+        GPKGAddress.street_id,
+        GPKGAddress.strname_fre,
+        GPKGAddress.strname_dut,
+        GPKGAddress.policenum,
+        GPKGAddress.box_number,
+        GPKGAddress.zipcode,
+        GPKGAddress.munnis_code,
+        GPKGAddress.munname_fre,
+        GPKGAddress.munname_dut,
+        GPKGAddress.parent_id,
+        GPKGAddress.carto_angle,
+        GPKGAddress.xl72,
+        GPKGAddress.yl72,
+        GPKGAddress.capakey,
+        GPKGAddress.statnis_code,
+        GPKGAddress.bu_id,
+    )
+    municipality_ids: dict[bytes, int] = {}
+    street_ids: dict[bytes, int] = {}
+
+    for (address_pk, geom, inspire_id, street_uri, strname_fre, strname_dut, policenum, box_number, zipcode,
+         munnis_code, munname_fre, munname_dut, parent_id, carto_angle, xl72, yl72, capakey, statnis_code, bu_id) in iter_rows(stmt):
+        if MAX is not None and i > MAX:
+            break
+
+        # The same few thousand URIs repeat on every row: one dict lookup unless it is the first occurrence
+        municipality_id = municipality_ids.get(munnis_code)
+        if municipality_id is None:
+            municipality_id = read_municipality_id(munnis_code)
+            municipality_ids[munnis_code] = municipality_id
             if municipality_id not in municipalities:
                 municipality = Municipality(
                     municipality_id=municipality_id,
-                    municipality_name_dutch=gpkg_address.munname_dut,
-                    municipality_name_french=gpkg_address.munname_fre,
+                    municipality_name_dutch=decode(munname_dut),
+                    municipality_name_french=decode(munname_fre),
+                    cleaned_municipality_name_dutch=_norm(decode(munname_dut)),
+                    cleaned_municipality_name_french=_norm(decode(munname_fre)),
                 )
                 municipalities[municipality_id] = municipality
 
-            street_id = read_inspire_id(gpkg_address.street_id, InspireBaseURI.STREET_NAME)
+        street_id = street_ids.get(street_uri)
+        if street_id is None:
+            street_id = read_street_name_id(street_uri)
+            street_ids[street_uri] = street_id
             if street_id not in streets:
                 street = Street(
                     street_id=street_id,
-                    street_name_dutch=gpkg_address.strname_dut,
-                    street_name_french=gpkg_address.strname_fre,
-                    cleaned_street_name_dutch=_norm(gpkg_address.strname_dut),
-                    cleaned_street_name_french=_norm(gpkg_address.strname_fre),
+                    street_name_dutch=decode(strname_dut),
+                    street_name_french=decode(strname_fre),
+                    cleaned_street_name_dutch=_norm(decode(strname_dut)),
+                    cleaned_street_name_french=_norm(decode(strname_fre)),
                 )
                 streets[street_id] = street
 
-            cadastral_parcel_id = capa_key_to_capa_inspire_id.get(gpkg_address.capakey)
-            address = Address(
-                id=gpkg_address.id,
-                address_id=read_inspire_id(gpkg_address.inspire_id, InspireBaseURI.ADDRESS),
-                street_id=street_id,
-                municipality_id=municipality_id,
-                parent_id=read_inspire_id(gpkg_address.parent_id, InspireBaseURI.ADDRESS) if is_valid_inspire_id(gpkg_address.parent_id) else None,
-                cadastral_parcel_id=cadastral_parcel_id,
-                building_id=read_inspire_id(gpkg_address.bu_id, InspireBaseURI.BUILDING) if is_valid_inspire_id(gpkg_address.bu_id) else None,
-                carto_angle=gpkg_address.carto_angle,
-                postal_code=int(gpkg_address.zipcode),
-                police_number=gpkg_address.policenum,
-                box_number=gpkg_address.box_number,
-                stat_nis_code=gpkg_address.statnis_code,
-                l08=from_shape(force_to_lambert_08(gpkg_address.xl72, gpkg_address.yl72), srid=LAMBERT_08_SRID),
-                geometry=gpkg_address.geom,
-            )
-
-            yield address
-            i += 1
-
-def read_buildings() -> Iterator[Building]:
+        cadastral_parcel_id = capa_key_to_capa_inspire_id.get(capakey)
+        # Plain tuple in ADDRESS_COLUMNS order, geometries as EWKB bytes (binary COPY)
+        yield (
+            address_pk,
+            read_address_id(inspire_id),
+            street_id,
+            municipality_id,
+            read_address_id(parent_id) if is_valid_inspire_id(parent_id) else None,
+            cadastral_parcel_id,
+            read_building_id(bu_id) if is_valid_inspire_id(bu_id) else None,
+            carto_angle,
+            int(zipcode),
+            decode(policenum),
+            decode(box_number),
+            decode(statnis_code),
+            lambert_08_point(xl72, yl72),
+            read_geometry(geom),
+        )
+        i += 1
+
+def read_buildings() -> Iterator[tuple]:
     i = 0
-    with Session(engine) as session:
-        stmt = select(GPKGBuilding)
-        results = session.execute(stmt).yield_per(1000).scalars()
-
-        for gpkg_building in results:
-            if MAX is not None and i > MAX:
-                break
-
-            building = Building(
-                id=gpkg_building.id,
-                building_id=read_inspire_id(gpkg_building.inspire_id, InspireBaseURI.BUILDING),
-                block_id=read_inspire_id(gpkg_building.block_id, InspireBaseURI.BLOCK) if is_valid_inspire_id(gpkg_building.block_id) else None,
-                area=gpkg_building.area,
-                geometry=gpkg_building.geom,
-            )
-
-            yield building
-            i += 1
-
-def read_cadastral_parcels(capa_key_to_capa_inspire_id: dict[str, int]) -> Iterator[CadastralParcel]:
+    stmt = select(GPKGBuilding.id, GPKGBuilding.geom, GPKGBuilding.inspire_id, GPKGBuilding.block_id, GPKGBuilding.area)
+
+    for building_pk, geom, inspire_id, block_id, area in iter_rows(stmt):
+        if MAX is not None and i > MAX:
+            break
+
+        # Plain tuple in BUILDING_COLUMNS order
+        yield (
+            building_pk,
+            read_building_id(inspire_id),
+            read_block_id(block_id) if is_valid_inspire_id(block_id) else None,
+            area,
+            read_geometry(geom),
+        )
+        i += 1
+
+def read_cadastral_parcels(capa_key_to_capa_inspire_id: dict[bytes, int]) -> Iterator[tuple]:
     i = 0
-    with Session(engine) as session:
-        stmt = select(GPKGCadastralParcel)
-        results = session.execute(stmt).yield_per(1000).scalars()
-
-        for gpkg_cadastral_parcel in results:
-            if MAX is not None and i > MAX:
-                break
-
-            cadastral_parcel_id = read_inspire_id(gpkg_cadastral_parcel.inspire_id, InspireBaseURI.CADASTRAL_PARCEL)
-            cadastral_parcel = CadastralParcel(
-                id=gpkg_cadastral_parcel.id,
-                cadastral_parcel_id=cadastral_parcel_id,
-                cadastral_division=int(gpkg_cadastral_parcel.cadastr_div),
-                municipality_id=int(gpkg_cadastral_parcel.munnis_code) if is_valid_inspire_id(gpkg_cadastral_parcel.munnis_code) else None,
-                area=gpkg_cadastral_parcel.area,
-                type=CadastralParcelType[gpkg_cadastral_parcel.type],
-                cadastral_parcel_key=gpkg_cadastral_parcel.capakey,
-                geometry=gpkg_cadastral_parcel.geom,
-            )
-
-            capa_key_to_capa_inspire_id[gpkg_cadastral_parcel.capakey] = cadastral_parcel_id
-
-            yield cadastral_parcel
-            i += 1
-
-def read_inspire_id(uri: str, uri_base: InspireBaseURI) -> int:
-    id_part = uri.removeprefix(uri_base.value)
-    return int(id_part)
+    stmt = select(
+        GPKGCadastralParcel.id,
+        GPKGCadastralParcel.geom,
+        GPKGCadastralParcel.capakey,
+        GPKGCadastralParcel.type,
+        GPKGCadastralParcel.cadastr_div,
+        GPKGCadastralParcel.munnis_code,
+        GPKGCadastralParcel.inspire_id,
+        GPKGCadastralParcel.area,
+    )
+
+    for cadastral_parcel_pk, geom, capakey, parcel_type, cadastr_div, munnis_code, inspire_id, area in iter_rows(stmt):
+        if MAX is not None and i > MAX:
+            break
+
+        cadastral_parcel_id = read_cadastral_parcel_id(inspire_id)
+        capa_key_to_capa_inspire_id[capakey] = cadastral_parcel_id
+
+        # Plain tuple in CADASTRAL_PARCEL_COLUMNS order
+        yield (
+            cadastral_parcel_pk,
+            cadastral_parcel_id,
+            int(cadastr_div),
+            int(munnis_code) if is_valid_inspire_id(munnis_code) else None,
+            area,
+            CadastralParcelType[parcel_type.decode()].value,
+            decode(capakey),
+            read_geometry(geom),
+        )
+        i += 1
+
+# INSPIRE ids are the integer after a fixed base URI, sliced off the undecoded bytes of iter_rows
+# by its precomputed length
+_ADDRESS_PREFIX_LENGTH = len(InspireBaseURI.ADDRESS.value)
+_BLOCK_PREFIX_LENGTH = len(InspireBaseURI.BLOCK.value)
+_BUILDING_PREFIX_LENGTH = len(InspireBaseURI.BUILDING.value)
+_CADASTRAL_PARCEL_PREFIX_LENGTH = len(InspireBaseURI.CADASTRAL_PARCEL.value)
+_MUNICIPALITY_PREFIX_LENGTH = len(InspireBaseURI.MUNICIPALITY.value)
+_STREET_NAME_PREFIX_LENGTH = len(InspireBaseURI.STREET_NAME.value)
+
+def read_address_id(uri: bytes) -> int:
+    return int(uri[_ADDRESS_PREFIX_LENGTH:])
+
+def read_block_id(uri: bytes) -> int:
+    return int(uri[_BLOCK_PREFIX_LENGTH:])
+
+def read_building_id(uri: bytes) -> int:
+    return int(uri[_BUILDING_PREFIX_LENGTH:])
+
+def read_cadastral_parcel_id(uri: bytes) -> int:
+    return int(uri[_CADASTRAL_PARCEL_PREFIX_LENGTH:])
+
+def read_municipality_id(uri: bytes) -> int:
+    return int(uri[_MUNICIPALITY_PREFIX_LENGTH:])
+
+def read_street_name_id(uri: bytes) -> int:
+    return int(uri[_STREET_NAME_PREFIX_LENGTH:])
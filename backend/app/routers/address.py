@@ -3,47 +3,75 @@ from app.core.deps import get_db
 from app.core.models import Address
 from app.schemas import requests, responses
 from app.utils import transform_geometry
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from geoalchemy2 import WKBElement
 from geoalchemy2.shape import to_shape
-from shapely.geometry import mapping
+from pydantic import TypeAdapter
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.parsers.address import resolve
+import json
+import shapely
+import struct
+
+
+POINT_COORDINATES = struct.Struct('<dd')
+RESOLVE_RESULT_ADAPTER = TypeAdapter(responses.ResolveResult)
 
 
 api_router = APIRouter(prefix='')
 
-@api_router.post('/by_address_id')
-async def get_addresses(address_list: requests.AddressList, db: AsyncSession = Depends(get_db)) -> list[responses.Address]:
-    stmt = select(Address).where(Address.address_id.in_(address_list.address_ids))
-    result = await db.execute(stmt)
+def _point_coordinates(element: WKBElement) -> tuple[float, float]:
+    """x, y of a 2D point read straight from its (E)WKB, without building a Shapely Point."""
+    data = bytes(element.data)
+    if data[0] != 1:
+        return to_shape(element).coords[0]
+    # The SRID flag of EWKB inserts 4 bytes between the geometry type and the coordinates
+    return POINT_COORDINATES.unpack_from(data, 9 if data[4] & 0x20 else 5)
+
+
+def _address_json(row: Address, l08_json: str, geometry_json: str) -> str:
+    fields = json.dumps({
+        'id': row.id,
+        'address_id': row.address_id,
+        'street_id': row.street_id,
+        'municipality_id': row.municipality_id,
+        'parent_id': row.parent_id,
+        'cadastral_parcel_id': row.cadastral_parcel_id,
+        'building_id': row.building_id,
+        'carto_angle': row.carto_angle,
+        'postal_code': row.postal_code,
+        'police_number': row.police_number,
+        'box_number': row.box_number,
+        'stat_nis_code': row.stat_nis_code,
+    }, separators=(',', ':'))
+    return f'{fields[:-1]},"l08":{l08_json},"geometry":{geometry_json}}}'
+
+
+# Written out directly: the geometries we produce are valid GeoJSON, no need for pydantic to walk their coordinates
+@api_router.post('/by_address_id', response_model=None, responses={200: {'model': list[responses.Address]}})
+async def get_addresses(address_list: requests.AddressList, db: AsyncSession = Depends(get_db)) -> Response:
+    destination_srid = address_list.destination_srid
+    stmt = select(Address).where(Address.address_id.in_(address_list.address_ids)).execution_options(yield_per=500)
+    result = await db.stream(stmt)
     results = []
-    for row in result.scalars():
-        l08 = to_shape(row.l08)
-        if address_list.destination_srid is not None:
-            l08 = transform_geometry(l08, LAMBERT_08_SRID, address_list.destination_srid)
-        geometry = to_shape(row.geometry)
-        if address_list.destination_srid is not None:
-            geometry = transform_geometry(geometry, LAMBERT_72_SRID, address_list.destination_srid)
-        results.append(responses.Address(
-            id=row.id,
-            address_id=row.address_id,
-            street_id=row.street_id,
-            municipality_id=row.municipality_id,
-            parent_id=row.parent_id,
-            cadastral_parcel_id=row.cadastral_parcel_id,
-            building_id=row.building_id,
-            carto_angle=row.carto_angle,
-            postal_code=row.postal_code,
-            police_number=row.police_number,
-            box_number=row.box_number,
-            stat_nis_code=row.stat_nis_code,
-            l08=mapping(l08),
-            geometry=mapping(geometry),
-        ))
-    return results
-
-
-@api_router.post('/search')
-async def search_address(search_address: requests.SearchAddress, db: AsyncSession = Depends(get_db)) -> responses.ResolveResult:
-    return await resolve(db, search_address)
+    async for partition in result.scalars().partitions():
+        # Decoded and reprojected a partition at a time, with the transformers cached per SRID pair
+        geometries = shapely.from_wkb([bytes(row.geometry.data) for row in partition])
+        if destination_srid is not None:
+            geometries = transform_geometry(geometries, LAMBERT_72_SRID, destination_srid)
+            l08s_json = shapely.to_geojson(transform_geometry(shapely.from_wkb([bytes(row.l08.data) for row in partition]), LAMBERT_08_SRID, destination_srid))
+        else:
+            l08s_json = [f'{{"type":"Point","coordinates":{json.dumps(_point_coordinates(row.l08))}}}' for row in partition]
+
+        results.extend([
+            _address_json(row, l08_json, geometry_json)
+            for row, geometry_json, l08_json in zip(partition, shapely.to_geojson(geometries), l08s_json)
+        ])
+    return Response(content=f'[{",".join(results)}]', media_type='application/json')
+
+
+# Serialized by pydantic-core in a single call, without FastAPI validating the dataclasses again on the way out
+@api_router.post('/search', response_model=None, responses={200: {'model': responses.ResolveResult}})
+async def search_address(search_address: requests.SearchAddress, db: AsyncSession = Depends(get_db)) -> Response:
+    return Response(content=RESOLVE_RESULT_ADAPTER.dump_json(await resolve(db, search_address)), media_type='application/json')
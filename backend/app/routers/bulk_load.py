@@ -0,0 +1,143 @@
+from geoalchemy2 import Geometry as GeometryType
+from typing import AsyncIterator, Iterable
+import asyncio
+import functools
+import itertools
+import numpy as np
+import operator
+import queue
+import shapely
+import threading
+import time
+
+
+@functools.lru_cache(maxsize=None)
+def _copy_columns(table) -> tuple[tuple[str, ...], tuple[int, ...]]:
+    """Names of the columns of a mapped class that COPY fills, and the positions of its geometry columns among them."""
+    # Generated columns are computed by PostgreSQL and cannot be copied into
+    columns = [column for column in table.__table__.columns if column.computed is None]
+    return tuple(column.name for column in columns), tuple(i for i, column in enumerate(columns) if isinstance(column.type, GeometryType))
+
+async def bulk_insert(table, raw_conn, iterable, chunk_size=1_000) -> int:
+    """
+    Binary COPY of ORM instances, through `bulk_copy_records`: their column values are read as tuples
+    and their Shapely geometries written as WKB (PostGIS takes the SRID of the column).
+    """
+    table_columns, geometry_indexes = _copy_columns(table)
+    # All the column values of an instance in a single C call (a lone column is not wrapped in a tuple by attrgetter)
+    getter = operator.attrgetter(*table_columns) if len(table_columns) > 1 else lambda obj: (getattr(obj, table_columns[0]),)
+
+    def records():
+        if not geometry_indexes:
+            yield from map(getter, iterable)
+            return
+        # Geometries are encoded a chunk at a time by a single GEOS call per column, not one WKB per row
+        iterator = iter(iterable)
+        while chunk := [getter(obj) for obj in itertools.islice(iterator, chunk_size)]:
+            columns_values = list(zip(*chunk))
+            for i in geometry_indexes:
+                columns_values[i] = shapely.to_wkb(np.array(columns_values[i], dtype=object))
+            yield from zip(*columns_values)
+
+    return await bulk_copy_records(table, raw_conn, records(), table_columns)
+
+async def bulk_copy_records(table, raw_conn, records, columns: list[str]) -> int:
+    """
+    Binary COPY of plain tuples ordered as `columns`, skipping the per-row text formatting of `bulk_insert`.
+    Geometries are given as (E)WKB bytes, which PostGIS reads as is in binary format.
+    """
+    underlying_table = table.__table__
+    driver_connection = raw_conn.driver_connection
+
+    gen = RecordIterator(records)
+
+    await driver_connection.set_type_codec('geometry', schema='public', encoder=bytes, decoder=bytes, format='binary')
+    try:
+        await driver_connection.copy_records_to_table(
+            table_name=underlying_table.name,
+            records=iterate_in_thread(gen),
+            columns=columns,
+            schema_name=underlying_table.schema,
+        )
+    finally:
+        # The connection goes back to the pool, other queries keep the default geometry handling
+        await driver_connection.reset_type_codec('geometry', schema='public')
+
+    return gen.count
+
+async def iterate_in_thread(records: Iterable, chunk_size=1_000, max_chunks=16) -> AsyncIterator:
+    """
+    Iterate a blocking generator (e.g. a GeoPackage scan) in a worker thread, so that producing the records
+    overlaps with what the event loop does with them. Records are handed over in chunks through a bounded queue.
+    """
+    chunks = queue.Queue(maxsize=max_chunks)
+    stopped = threading.Event()
+    end = object()
+
+    def put(item) -> bool:
+        # Gives up once the consumer is gone instead of blocking forever on a full queue
+        while not stopped.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            chunk = []
+            for record in records:
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    if not put(chunk):
+                        return
+                    chunk = []
+            if put(chunk):
+                put(end)
+        except BaseException as e:
+            put(e)
+
+    def get():
+        # Same for the consumer side: a cancelled consumer must not leave a thread waiting on the queue
+        while not stopped.is_set():
+            try:
+                return chunks.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return end
+
+    producer = asyncio.create_task(asyncio.to_thread(produce))
+    try:
+        while (chunk := await asyncio.to_thread(get)) is not end:
+            if isinstance(chunk, BaseException):
+                raise chunk
+            for record in chunk:
+                yield record
+    finally:
+        stopped.set()
+        await producer
+
+class RecordIterator:
+    def __init__(self, records, report_every=10_000):
+        self.records = records
+        self.report_every = report_every
+        self.count = 0
+        self.start = time.perf_counter()
+
+    def __iter__(self):
+        # Counted in locals, with a countdown to the next report rather than a modulo per record
+        count = self.count
+        next_report = self.report_every
+        try:
+            for record in self.records:
+                yield record
+                count += 1
+                next_report -= 1
+                if not next_report:
+                    next_report = self.report_every
+                    elapsed = time.perf_counter() - self.start
+                    speed = count / elapsed
+                    print(f"{count} records processed at {speed:,.0f} records/s")
+        finally:
+            self.count = count
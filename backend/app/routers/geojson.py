@@ -0,0 +1,20 @@
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from shapely import Geometry
+from typing import Any
+import json
+import numpy as np
+import shapely
+
+
+def feature_collection_response(geometries: list[Geometry], properties: list[dict[str, Any]]) -> Response:
+    """
+    GeoJSON FeatureCollection of the geometries (and their properties) written out directly:
+    GEOS serializes all the geometries at once, no mapping() dicts nor pydantic walk of every coordinate.
+    """
+    geometries_json = shapely.to_geojson(np.array(geometries, dtype=object)) if len(geometries) else []
+    features = ','.join(
+        f'{{"type":"Feature","geometry":{geometry_json or "null"},"properties":{json.dumps(jsonable_encoder(feature_properties), separators=(",", ":"))}}}'
+        for geometry_json, feature_properties in zip(geometries_json, properties)
+    )
+    return Response(content=f'{{"type":"FeatureCollection","features":[{features}]}}', media_type='application/json')
@@ -8,14 +8,93 @@ from app.core.models import (
     ForbiddenArea, ForbiddenAreaTMP
 )
 from app.parsers import forbidden_areas, urbis_parcel_and_building, urbis_3d_construction
-from app.utils import fully_qualified_table_name, bulk_insert, IndexDescription, IndexType, get_index_columns, get_index_name, get_index_type, project_to_ground
+from app.routers.bulk_load import bulk_insert, bulk_copy_records
+from app.utils import fully_qualified_table_name, IndexDescription, IndexType, get_index_type, project_to_ground
 from fastapi import APIRouter, Depends
+import asyncio
+import numpy as np
+from shapely import STRtree
 from sqlalchemy import delete, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 api_router = APIRouter(prefix='')
 
+# Static, so built once at import along with the column names and SQL fragments of each index
+PARCEL_AND_BUILDING_INDEXES = {
+    AddressTMP: [
+        IndexDescription(
+            columns=[AddressTMP.address_id],
+            index_type=IndexType.BTREE
+        ),
+        IndexDescription(
+            columns=[AddressTMP.street_id],
+            index_type=IndexType.BTREE
+        ),
+        IndexDescription(
+            columns=[AddressTMP.building_id],
+            index_type=IndexType.BTREE
+        ),
+        IndexDescription(
+            columns=[AddressTMP.l08],
+            index_type=IndexType.GIST
+        ),
+    ],
+    BuildingTMP: [
+        IndexDescription(
+            columns=[BuildingTMP.building_id],
+            index_type=IndexType.BTREE
+        ),
+        IndexDescription(
+            columns=[BuildingTMP.geometry],
+            index_type=IndexType.GIST
+        ),
+    ],
+    CadastralParcelTMP: [
+        IndexDescription(
+            columns=[CadastralParcelTMP.cadastral_parcel_id],
+            index_type=IndexType.BTREE
+        ),
+        IndexDescription(
+            columns=[CadastralParcelTMP.geometry],
+            index_type=IndexType.GIST
+        ),
+    ],
+    StreetTMP: [
+        IndexDescription(
+            columns=[StreetTMP.cleaned_street_name_french],
+            index_type=IndexType.GIN_TRIGRAM
+        ),
+        IndexDescription(
+            columns=[StreetTMP.cleaned_street_name_dutch],
+            index_type=IndexType.GIN_TRIGRAM
+        ),
+        IndexDescription(
+            columns=[StreetTMP.street_tokens_french],
+            index_type=IndexType.GIN
+        ),
+        IndexDescription(
+            columns=[StreetTMP.street_tokens_dutch],
+            index_type=IndexType.GIN
+        ),
+    ],
+}
+
+CONSTRUCTION_3D_INDEXES = {
+    BuildingFaceTMP: [
+        IndexDescription(
+            columns=[BuildingFaceTMP.building_solid_id],
+            index_type=IndexType.BTREE
+        ),
+    ],
+    BuildingSolidTMP: [
+        IndexDescription(
+            columns=[BuildingSolidTMP.geometry],
+            index_type=IndexType.GIST
+        ),
+    ]
+}
+
 
 @api_router.post('/load/parcel_and_building')
 async def load_parcel_and_building(db: AsyncSession = Depends(get_db)):
@@ -35,52 +114,18 @@ async def load_parcel_and_building(db: AsyncSession = Depends(get_db)):
     counters = {}
     municipalities: dict[int, MunicipalityTMP] = {}
     streets: dict[int, StreetTMP] = {}
-    capa_key_to_capa_inspire_id: dict[str, int] = {}
-    counters['cadastral_parcel'] = await bulk_insert(CadastralParcelTMP, raw_conn, urbis_parcel_and_building.read_cadastral_parcels(capa_key_to_capa_inspire_id))
-    counters['address'] = await bulk_insert(AddressTMP, raw_conn, urbis_parcel_and_building.read_addresses(capa_key_to_capa_inspire_id, municipalities, streets))
-    counters['building'] = await bulk_insert(BuildingTMP, raw_conn, urbis_parcel_and_building.read_buildings())
+    capa_key_to_capa_inspire_id: dict[bytes, int] = {}
+
+    # One GeoPackage scan at a time: addresses are linked to the parcels read just before
+    counters['cadastral_parcel'] = await bulk_copy_records(CadastralParcelTMP, raw_conn, urbis_parcel_and_building.read_cadastral_parcels(capa_key_to_capa_inspire_id), urbis_parcel_and_building.CADASTRAL_PARCEL_COLUMNS)
+    counters['address'] = await bulk_copy_records(AddressTMP, raw_conn, urbis_parcel_and_building.read_addresses(capa_key_to_capa_inspire_id, municipalities, streets), urbis_parcel_and_building.ADDRESS_COLUMNS)
+    counters['building'] = await bulk_copy_records(BuildingTMP, raw_conn, urbis_parcel_and_building.read_buildings(), urbis_parcel_and_building.BUILDING_COLUMNS)
     counters['municipality'] = await bulk_insert(MunicipalityTMP, raw_conn, municipalities.values())
     counters['street'] = await bulk_insert(StreetTMP, raw_conn, streets.values())
 
-    associated_indexes = {
-        AddressTMP: [
-            IndexDescription(
-                columns=[AddressTMP.address_id],
-                index_type=IndexType.BTREE
-            ),
-            IndexDescription(
-                columns=[AddressTMP.street_id],
-                index_type=IndexType.BTREE
-            ),
-            IndexDescription(
-                columns=[AddressTMP.l08],
-                index_type=IndexType.GIST
-            ),
-        ],
-        BuildingTMP: [
-            IndexDescription(
-                columns=[BuildingTMP.building_id],
-                index_type=IndexType.BTREE
-            ),
-            IndexDescription(
-                columns=[BuildingTMP.geometry],
-                index_type=IndexType.GIST
-            ),
-        ],
-        CadastralParcelTMP: [
-            IndexDescription(
-                columns=[CadastralParcelTMP.cadastral_parcel_id],
-                index_type=IndexType.BTREE
-            ),
-            IndexDescription(
-                columns=[CadastralParcelTMP.geometry],
-                index_type=IndexType.GIST
-            ),
-        ],
-    }
 
-    await _create_indexes(async_engine, associated_indexes)
-    await _replace_tables(async_engine, tmp_table_associations, associated_indexes)
+    await _create_indexes(async_engine, PARCEL_AND_BUILDING_INDEXES)
+    await _replace_tables(async_engine, tmp_table_associations, PARCEL_AND_BUILDING_INDEXES)
 
     return counters
 
@@ -98,25 +143,24 @@ async def load_3d_construction(db: AsyncSession = Depends(get_db)):
 
     await _create_tables(async_engine, tmp_table_associations)
 
-    forbidden_areas_polygons = forbidden_areas.read_forbidden_areas_polygons(destination_srid=LAMBERT_72_SRID)
+    forbidden_areas_polygons = await forbidden_areas.read_forbidden_areas_polygons(destination_srid=LAMBERT_72_SRID)
 
     building_solids: dict[int, BuildingSolid] = {}
-    building_face_count = await bulk_insert(BuildingFaceTMP, raw_conn, urbis_3d_construction.read_building_faces(building_solids))
+    building_face_count = await bulk_copy_records(BuildingFaceTMP, raw_conn, urbis_3d_construction.read_building_faces(building_solids), urbis_3d_construction.BUILDING_FACE_COLUMNS)
     building_solid_count = await bulk_insert(BuildingSolidTMP, raw_conn, building_solids.values())
     forbidden_area_count = await bulk_insert(ForbiddenAreaTMP, raw_conn, [ForbiddenAreaTMP(
         id=i,
         geometry=geometry
     ) for i, geometry in enumerate(forbidden_areas_polygons)])
 
-    to_remove: set[int] = set()
-    for building_solid_id, building_solid in building_solids.items():
-        try:
-            ground_projected = project_to_ground(building_solid.geometry)
-            matches = [p for p in forbidden_areas_polygons if ground_projected.intersects(p)]
-            if len(matches) > 0:
-                to_remove.add(building_solid_id)
-        except:
-            continue
+    # Bounding-box tree: only the few polygons whose envelope overlaps get the exact intersects test,
+    # queried once for all the solids (solids without a ground surface have no geometry to test)
+    forbidden_areas_index = STRtree(forbidden_areas_polygons)
+    building_solid_ids = [building_solid_id for building_solid_id, building_solid in building_solids.items() if building_solid.geometry is not None]
+    geometries = np.array([building_solids[building_solid_id].geometry for building_solid_id in building_solid_ids], dtype=object)
+    ground_projected = project_to_ground(geometries)
+    solid_indices, _ = forbidden_areas_index.query(ground_projected, predicate='intersects')
+    to_remove: set[int] = {building_solid_ids[i] for i in solid_indices}
 
     async with async_engine.begin() as conn:
         await conn.execute(
@@ -130,23 +174,9 @@ async def load_3d_construction(db: AsyncSession = Depends(get_db)):
             )
         )
 
-    associated_indexes = {
-        BuildingFaceTMP: [
-            IndexDescription(
-                columns=[BuildingFaceTMP.building_solid_id],
-                index_type=IndexType.BTREE
-            ),
-        ],
-        BuildingSolidTMP: [
-            IndexDescription(
-                columns=[BuildingSolidTMP.geometry],
-                index_type=IndexType.GIST
-            ),
-        ]
-    }
 
-    await _create_indexes(async_engine, associated_indexes)
-    await _replace_tables(async_engine, tmp_table_associations, associated_indexes)
+    await _create_indexes(async_engine, CONSTRUCTION_3D_INDEXES)
+    await _replace_tables(async_engine, tmp_table_associations, CONSTRUCTION_3D_INDEXES)
 
     return {
         'building_face': building_face_count,
@@ -161,12 +191,18 @@ async def _create_tables(async_engine, tmp_table_associations: dict):
             await conn.run_sync(lambda sync_conn: table.create(sync_conn, checkfirst=True))
 
 async def _create_indexes(async_engine, associated_indexes: dict):
-    async with async_engine.begin() as conn:
-        for table_tmp, indexes in associated_indexes.items():
-            for index_description in indexes:
-                index_name = get_index_name(table_tmp, index_description.columns)
-                selected_columns = get_index_columns(index_description.columns)
-                await conn.execute(text(f'CREATE INDEX "{index_name}" ON {fully_qualified_table_name(table_tmp)} {get_index_type(index_description.index_type)} ({selected_columns});'))
+    statements = []
+    for table_tmp, indexes in associated_indexes.items():
+        for index_description in indexes:
+            index_name = index_description.index_name(table_tmp)
+            statements.append(f'CREATE INDEX "{index_name}" ON {fully_qualified_table_name(table_tmp)} {get_index_type(index_description.index_type)} ({index_description.columns_sql});')
+
+    # The TMP tables are not read yet, so the builds are independent: one connection each, all at once
+    async def create_index(statement: str):
+        async with async_engine.begin() as conn:
+            await conn.execute(text(statement))
+
+    await asyncio.gather(*[create_index(statement) for statement in statements])
 
 async def _replace_tables(async_engine, tmp_table_associations: dict, associated_indexes: dict):
     async with async_engine.begin() as conn:
@@ -174,6 +210,8 @@ async def _replace_tables(async_engine, tmp_table_associations: dict, associated
             await conn.execute(text(f'DROP TABLE {fully_qualified_table_name(table)}'))
             await conn.execute(text(f'ALTER TABLE {fully_qualified_table_name(tmp_table)} RENAME TO "{table.__tablename__}"'))
             for index_description in associated_indexes.get(tmp_table, []):
-                tmp_index_name = get_index_name(tmp_table, index_description.columns)
-                index_name = get_index_name(table, index_description.columns)
+                tmp_index_name = index_description.index_name(tmp_table)
+                index_name = index_description.index_name(table)
                 await conn.execute(text(f'ALTER INDEX "{table.__table__.schema}"."{tmp_index_name}" RENAME TO "{index_name}"'))
+            # Fresh tables have no statistics yet; without them the planner may skip the GIST indexes
+            await conn.execute(text(f'ANALYZE {fully_qualified_table_name(table)}'))
@@ -3,18 +3,22 @@ from app.core.deps import get_db
 from app.core.models import BuildingFace, BuildingSolid
 from app.enums.building_face_type import BuildingFaceType
 from app.schemas import requests, responses
-from app.utils import compute_polygon_area, transform_geometry
-from fastapi import APIRouter, Depends
-from geoalchemy2.shape import from_shape, to_shape
+from app.routers.geojson import feature_collection_response
+from app.utils import compute_polygon_area, from_wkb_elements, transform_geometry
+from fastapi import APIRouter, Depends, Response
+from geoalchemy2.shape import from_shape
 from geoalchemy2.functions import ST_DWithin, ST_Distance, ST_Intersects, ST_Within
-from shapely.geometry import mapping, Point, box
-from sqlalchemy import select
+from shapely.geometry import Point, box
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any
 
 
 api_router = APIRouter(prefix='')
 
+# Built once, only the parameter is bound per request (see BUILDING_BY_ID in the building router)
+BUILDING_FACES_BY_SOLID_ID = select(BuildingFace).where(BuildingFace.building_solid_id == bindparam('building_solid_id'))
+
 
 def _get_building_face_properties(face: BuildingFace) -> dict[str, Any]:
     return {
@@ -27,16 +31,16 @@ def _get_building_face_properties(face: BuildingFace) -> dict[str, Any]:
     }
 
 
-@api_router.post('/building_solid')
-async def get_building_solid(building_solid: requests.BuildingSolid, db: AsyncSession = Depends(get_db)) -> responses.FeatureCollection:
-    stmt = select(BuildingFace).where(BuildingFace.building_solid_id == building_solid.building_solid_id)
-    result = await db.execute(stmt)
-    faces: list[BuildingFace] = result.scalars()
-
-    features = []
-    for face in faces:
-        geom = to_shape(face.geometry)
+@api_router.post('/building_solid', response_model=None, responses={200: {'model': responses.FeatureCollection}})
+async def get_building_solid(building_solid: requests.BuildingSolid, db: AsyncSession = Depends(get_db)) -> Response:
+    result = await db.execute(BUILDING_FACES_BY_SOLID_ID, {'building_solid_id': building_solid.building_solid_id})
+    faces: list[BuildingFace] = result.scalars().all()
 
+    # Decoded in one call for the whole solid; the area stays computed here since the faces are
+    # 3D and ST_Area would only give the footprint on the XY plane (zero for the walls)
+    geometries = from_wkb_elements([face.geometry for face in faces])
+    properties_list = []
+    for face, geom in zip(faces, geometries):
         properties = _get_building_face_properties(face)
         if building_solid.compute_area:
             assert face.geometry.srid == LAMBERT_72_SRID
@@ -45,26 +49,18 @@ async def get_building_solid(building_solid: requests.BuildingSolid, db: AsyncSe
                 properties['area'] = compute_polygon_area(geom)
             except:
                 properties['area'] = 0
+        properties_list.append(properties)
 
-        if building_solid.destination_srid is not None:
-            geom = transform_geometry(geom, LAMBERT_72_SRID, building_solid.destination_srid)
-
-        features.append(responses.Feature(
-            type='Feature',
-            geometry=mapping(geom),
-            properties=properties
-        ))
+    if building_solid.destination_srid is not None:
+        geometries = transform_geometry(geometries, LAMBERT_72_SRID, building_solid.destination_srid)
 
-    return responses.FeatureCollection(
-        type='FeatureCollection',
-        features=features
-    )
+    return feature_collection_response(geometries, properties_list)
 
-@api_router.post('/bbox')
+@api_router.post('/bbox', response_model=None, responses={200: {'model': responses.FeatureCollection}})
 async def search_building_solids_by_bbox(
     search: requests.SearchBuildingSolidByBbox,
     db: AsyncSession = Depends(get_db)
-) -> responses.FeatureCollection:
+) -> Response:
     """
     Return all BuildingSolid features that intersect (default) or are fully within
     the provided bounding box.
@@ -97,65 +93,48 @@ async def search_building_solids_by_bbox(
     rows = await db.execute(stmt)
 
     # 4) Build GeoJSON features (transform to destination SRID if requested)
-    features = []
-    for (building,) in rows:
-        geom = to_shape(building.geometry)
-
-        if search.destination_srid is not None:
-            geom = transform_geometry(geom, LAMBERT_72_SRID, search.destination_srid)
-
-        features.append(
-            responses.Feature(
-                type='Feature',
-                geometry=mapping(geom),
-                properties={
-                    'building_solid_id': building.building_solid_id
-                }
-            )
-        )
-
-    return responses.FeatureCollection(
-        type='FeatureCollection',
-        features=features
-    )
-
-@api_router.post('/nearby')
-async def search_building_solid_by_distance(search: requests.SearchBuildingSolidByDistance, db: AsyncSession = Depends(get_db)) -> responses.FeatureCollection:
+    buildings: list[BuildingSolid] = rows.scalars().all()
+    geometries = from_wkb_elements([building.geometry for building in buildings])
+    if search.destination_srid is not None:
+        geometries = transform_geometry(geometries, LAMBERT_72_SRID, search.destination_srid)
+    properties_list = [{
+        'building_solid_id': building.building_solid_id
+    } for building in buildings]
+
+    return feature_collection_response(geometries, properties_list)
+
+@api_router.post('/nearby', response_model=None, responses={200: {'model': responses.FeatureCollection}})
+async def search_building_solid_by_distance(search: requests.SearchBuildingSolidByDistance, db: AsyncSession = Depends(get_db)) -> Response:
     point = Point(search.x72, search.y72)
     if search.source_srid is not None:
         point = transform_geometry(point, search.source_srid, LAMBERT_72_SRID)
     point_geom = from_shape(point, srid=LAMBERT_72_SRID)
 
-    distance_stmt = ST_Distance(BuildingSolid.geometry, point_geom)
+    # Ordered by the selected label, so ST_Distance is computed once per row
+    distance_stmt = ST_Distance(BuildingSolid.geometry, point_geom).label('distance')
     stmt = (
         select(
             BuildingSolid,
-            distance_stmt.label('distance')
+            distance_stmt
         )
         .where(ST_DWithin(BuildingSolid.geometry, point_geom, search.distance))
     )
     if search.ordered_by_distance is not None:
-        order_expr = distance_stmt
-        stmt = stmt.order_by(order_expr.desc() if search.ordered_by_distance is False else order_expr)
+        stmt = stmt.order_by(distance_stmt.desc() if search.ordered_by_distance is False else distance_stmt)
 
     rows = await db.execute(stmt)
 
-    features = []
+    rows = rows.all()
+
+    geometries = from_wkb_elements([building.geometry for building, _ in rows])
+    if search.destination_srid is not None:
+        geometries = transform_geometry(geometries, LAMBERT_72_SRID, search.destination_srid)
+    properties_list = []
     building: BuildingSolid
     for building, distance in rows:
-        geom = to_shape(building.geometry)
-        if search.destination_srid is not None:
-            geom = transform_geometry(geom, LAMBERT_72_SRID, search.destination_srid)
-        features.append(responses.Feature(
-            type='Feature',
-            geometry=mapping(geom),
-            properties={
-                'building_solid_id': building.building_solid_id,
-                'distance': distance
-            }
-        ))
-
-    return responses.FeatureCollection(
-        type='FeatureCollection',
-        features=features
-    )
+        properties_list.append({
+            'building_solid_id': building.building_solid_id,
+            'distance': distance
+        })
+
+    return feature_collection_response(geometries, properties_list)
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AddressResult:
     id: int
     address_id: int
@@ -14,7 +14,7 @@ class AddressResult:
     municipality_name_french: str | None
     building_id: int | None
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ResolveResult:
     query: dict[str, str | None]
     match: AddressResult | None
@@ -1,68 +1,88 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, auto
+from typing import Any, Iterable
+import functools
+import math
 import numpy as np
 from pyproj import Transformer
-from shapely import Geometry, Polygon
-from shapely.ops import transform
-import time
+import shapely
+from shapely import Geometry
 
 
-def transform_geometry(geometry: Geometry, source_srid: int, dest_srid: int) -> Geometry:
+@functools.lru_cache(maxsize=64)
+def get_transformer(source_srid: int, dest_srid: int) -> Transformer:
+    # Building a Transformer means a PROJ database lookup, reuse one per SRID pair
+    return Transformer.from_crs(source_srid, dest_srid, always_xy=True)
+
+def transform_geometry(geometry: Geometry | np.ndarray, source_srid: int, dest_srid: int) -> Geometry | np.ndarray:
+    # One pyproj call on the coordinate arrays rather than a callback per coordinate; also takes
+    # an array of geometries, each keeping its dimensionality (Z is passed through pyproj too)
     if source_srid == dest_srid:
         return geometry
-    transformer = Transformer.from_crs(source_srid, dest_srid, always_xy=True)
-    return transform(transformer.transform, geometry)
-
-def polygon_centroid_3d(poly: Geometry) -> np.array:
-    coords = np.array(poly.exterior.coords)
-    return coords.mean(axis=0)  # simple average of vertices
-
-def multipolygon_centroid_3d(multipoly: Geometry) -> np.array:
-    centroids = []
-    for poly in multipoly.geoms:
-        centroids.append(polygon_centroid_3d(poly))
-    return np.mean(centroids, axis=0)
-
-def compute_normal(geometry: Geometry) -> np.array:
-    if geometry.geom_type == 'MultiPolygon':
-        for geom in geometry.geoms:
-            return compute_normal(geom)
-    x = y = z = 0.0
-    coords = geometry.exterior.coords
-    for i in range(len(coords)):
-        current = coords[i]
-        nxt = coords[(i + 1) % len(coords)]
-        x += (current[1] - nxt[1]) * (current[2] + nxt[2])
-        y += (current[2] - nxt[2]) * (current[0] + nxt[0])
-        z += (current[0] - nxt[0]) * (current[1] + nxt[1])
-    norm = np.array([x, y, z])
-    return norm / np.linalg.norm(norm)
-
-def project_to_plane(geometry: Geometry) -> np.array:
-    centroid = multipolygon_centroid_3d(geometry)
-    normal = compute_normal(geometry)
-    u = np.cross(normal, [0, 0, 1])
-    if np.linalg.norm(u) < 1e-4:
-        u = np.cross(normal, [0, 1, 0])
-    u /= np.linalg.norm(u)
-    v = np.cross(normal, u)
-    projected = []
-    for geom in geometry.geoms:
-        for c in geom.exterior.coords:
-            vec = np.array(c) - centroid
-            x = np.dot(vec, u)
-            y = np.dot(vec, v)
-            projected.append((x, y))
-    return projected
-
-def project_to_ground(geometry: Geometry) -> Geometry:
-    return transform(lambda x, y, z=None: (x, y), geometry)
+    transformer = get_transformer(source_srid, dest_srid)
+    return shapely.transform(geometry, lambda coords: np.column_stack(transformer.transform(*coords.T)), include_z=None)
+
+# Rings up to this many vertices are handled with plain Python floats rather than NumPy arrays
+SMALL_RING_SIZE = 32
+
+def _norm3(vector: np.ndarray) -> float:
+    # Length of a 3-vector, without going through the generic np.linalg.norm machinery
+    x, y, z = vector.tolist()
+    return math.sqrt(x * x + y * y + z * z)
+
+def _exterior_coordinates(geometry: Geometry) -> tuple[np.ndarray, list[int]]:
+    """(N, 3) coordinates of the exterior rings of all the parts, read from GEOS at once, and the size of each ring."""
+    exteriors = shapely.get_exterior_ring(shapely.get_parts(geometry))
+    return shapely.get_coordinates(exteriors, include_z=True), shapely.get_num_coordinates(exteriors).tolist()
+
+def _newell_vector(ring: np.ndarray) -> np.array:
+    # Newell's method over the (N, 3) ring, each vertex paired with the next one (wrapping around)
+    if len(ring) <= SMALL_RING_SIZE:
+        # Walls and roof panes have a handful of vertices: there the per-call overhead of the NumPy
+        # kernels below outweighs a plain loop over the coordinate tuples
+        x = y = z = 0.0
+        current = ring.tolist()
+        for (x0, y0, z0), (x1, y1, z1) in zip(current, current[1:] + current[:1]):
+            x += (y0 - y1) * (z0 + z1)
+            y += (z0 - z1) * (x0 + x1)
+            z += (x0 - x1) * (y0 + y1)
+        return np.array([x, y, z])
+    nxt = np.roll(ring, -1, axis=0)
+    difference = ring - nxt
+    total = ring + nxt
+    x = (difference[:, 1] * total[:, 2]).sum()
+    y = (difference[:, 2] * total[:, 0]).sum()
+    z = (difference[:, 0] * total[:, 1]).sum()
+    return np.array([x, y, z])
+
+def _vector_area(coords: np.ndarray, ring_sizes: list[int]) -> np.array:
+    """
+    Sum of the vector areas of the rings: its direction is their area-weighted normal, its length
+    their area once projected on the plane of that normal.
+    """
+    # Relative to the mean vertex, so that the large Lambert coordinates do not cancel out
+    coords = coords - coords.mean(axis=0)
+    vector = np.zeros(3)
+    start = 0
+    for size in ring_sizes:
+        vector += _newell_vector(coords[start:start + size])
+        start += size
+    return vector / 2
+
+def project_to_ground(geometry: Geometry | np.ndarray) -> Geometry | np.ndarray:
+    # Also takes an array of geometries: GEOS drops Z from all of them, no coordinate copy through Python
+    return shapely.force_2d(geometry)
 
 def compute_polygon_area(geometry: Geometry) -> float:
-    projected = project_to_plane(geometry)
-    polygon = Polygon(projected)
-    return polygon.area
+    # The area projected on the plane of the normal is the length of the vector area itself:
+    # the normal and the area come out of the same pass, without any basis nor projection
+    return _norm3(_vector_area(*_exterior_coordinates(geometry)))
+
+def from_wkb_elements(elements: Iterable[Any]) -> np.ndarray:
+    """Shapely geometries of the given WKBElements, decoded by GEOS in a single call."""
+    return shapely.from_wkb([bytes(element.data) for element in elements])
 
+@functools.lru_cache(maxsize=None)
 def fully_qualified_table_name(o) -> str:
     table = o.__table__
     return f'"{table.schema}"."{table.name}"'
@@ -71,73 +91,35 @@ def fully_qualified_table_name(o) -> str:
 class IndexType(Enum):
     BTREE = auto()
     GIST = auto()
+    GIN = auto()
+    GIN_TRIGRAM = auto()
 
 @dataclass
 class IndexDescription:
     columns: list
     index_type: IndexType
+    # Derived once from the mapped attributes, instead of on each statement built for the index
+    column_names: list[str] = field(init=False, repr=False)
+    columns_sql: str = field(init=False, repr=False)
 
-def get_index_columns(columns: list) -> str:
-    return ', '.join(map(lambda x: x.property.columns[0].name, columns))
+    def __post_init__(self):
+        self.column_names = [column.property.columns[0].name for column in self.columns]
+        self.columns_sql = get_index_columns(self.columns, self.index_type)
 
-def get_index_name(table, columns: list) -> str:
-    table_name = table.__table__.name
-    columns_part = '_'.join(map(lambda x: x.property.columns[0].name, columns))
-    return f'{table_name}_{columns_part}'
+    def index_name(self, table) -> str:
+        return f'{table.__table__.name}_{"_".join(self.column_names)}'
+
+def get_index_columns(columns: list, index_type: IndexType = IndexType.BTREE) -> str:
+    operator_class = ' gin_trgm_ops' if index_type == IndexType.GIN_TRIGRAM else ''
+    return ', '.join(map(lambda x: x.property.columns[0].name + operator_class, columns))
 
 def get_index_type(index_type: IndexType) -> str:
     if index_type == IndexType.GIST:
         index_type = 'USING GIST'
     elif index_type == IndexType.BTREE:
         index_type = ''
+    elif index_type in (IndexType.GIN, IndexType.GIN_TRIGRAM):
+        index_type = 'USING GIN'
     else:
         raise NotImplementedError()
     return index_type
-
-async def bulk_insert(table, raw_conn, iterable) -> int:
-    underlying_table = table.__table__
-    table_columns = [column.name for column in underlying_table.columns]
-
-    gen = AsyncLineIterator(iterable, table_columns)
-
-    await raw_conn.driver_connection.copy_to_table(
-        table_name=underlying_table.name,
-        source=gen,
-        format='csv',
-        delimiter='\t',
-        columns=table_columns,
-        schema_name=underlying_table.schema,
-    )
-
-    return gen.count
-
-class AsyncLineIterator:
-    def __init__(self, records, columns, report_every=10_000):
-        self.records = iter(records)
-        self.columns = columns
-        self.report_every = report_every
-        self.count = 0
-        self.start = time.perf_counter()
-
-    def __aiter__(self):
-        return self
-
-    async def __anext__(self):
-        try:
-            obj = next(self.records)
-        except StopIteration:
-            raise StopAsyncIteration
-
-        vals = []
-        for column in self.columns:
-            v = getattr(obj, column)
-            vals.append('' if v is None else str(v))
-
-        line = '\t'.join(vals) + '\n'
-        self.count += 1
-        if self.report_every and self.count % self.report_every == 0:
-            elapsed = time.perf_counter() - self.start
-            speed = self.count / elapsed
-            print(f"{self.count} records processed at {speed:,.0f} records/s")
-
-        return line.encode('utf-8')
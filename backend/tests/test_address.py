@@ -0,0 +1,135 @@
+import pytest
+
+from app.parsers.address import _norm
+
+
+@pytest.mark.parametrize('name, expected', [
+    # Full names are left alone, abbreviation stems inside longer words included
+    ('Avenue Louise', 'avenue louise'),
+    ('Chaussée de Wavre', 'chaussee de wavre'),
+    ('Place Flagey', 'place flagey'),
+    ('Boulevard Anspach', 'boulevard anspach'),
+    ('Chapelle', 'chapelle'),
+    ('Plantinstraat', 'plantinstraat'),
+    ('Plezantstraat', 'plezantstraat'),
+    ('Simplonstraat', 'simplonstraat'),
+    ('Kerkstraat', 'kerkstraat'),
+    ('Dorpplein', 'dorpplein'),
+    ('Stationslaan', 'stationslaan'),
+    ('Waversesteenweg', 'waversesteenweg'),
+    # Abbreviations, with or without their dot
+    ('Av. Louise', 'avenue louise'),
+    ('Av Louise', 'avenue louise'),
+    ('Ch. de Wavre', 'chaussee de wavre'),
+    ('Pl. Flagey', 'place flagey'),
+    ('Bd. Anspach', 'boulevard anspach'),
+    ('Blvd Anspach', 'boulevard anspach'),
+    ('Rte de Lennik', 'route de lennik'),
+    ('St Gilles', 'saint gilles'),
+    ('Ste Catherine', 'sainte catherine'),
+    ('Kerkstr.', 'kerkstraat'),
+    ('Stationsln', 'stationslaan'),
+    ('Waversestwg', 'waversesteenweg'),
+    ('Waversesteenwg', 'waversesteenweg'),
+    ('Dorppl.', 'dorpplein'),
+    ('  Rue   Royale ', 'rue royale'),
+])
+def test_norm(name, expected):
+    assert _norm(name) == expected
+
+
+@pytest.mark.parametrize('free_text, street_name', [
+    ('Av. Louise 54', 'Avenue Louise'),
+    ('Ch. de Wavre 100', 'Chaussée de Wavre'),
+    ('Pl. Flagey 7', 'Place Flagey'),
+    ('Kerkstr. 12 1000 Brussel', 'Kerkstraat'),
+    ('Bd. Anspach 1', 'Boulevard Anspach'),
+])
+def test_abbreviated_street_matches_stored_tokens(free_text, street_name):
+    # Mirrors _street_token_filters against the columns filled at load: every token but the last is a whole
+    # word of the stored token array (regexp_split_to_array on the same separators), the last one a substring
+    from app.parsers.address import _TOKEN_SEPARATOR_PATTERN, _street_tokens, parse_address
+
+    parsed = parse_address(free_text)
+    cleaned_name = _norm(street_name)
+    stored_tokens = _TOKEN_SEPARATOR_PATTERN.split(cleaned_name)
+
+    *words, last = _street_tokens(parsed['street'])
+    assert set(words) <= set(stored_tokens)
+    assert last in cleaned_name
+
+
+def test_candidates_are_ranked_by_exact_number_before_the_limit():
+    # Every number of a long street ties on the street similarity: the exact one must not be cut by the limit
+    from app.enums.language import Language
+    from app.parsers.address import _candidate_ids_query, parse_address
+    from sqlalchemy.dialects import postgresql
+
+    statement = str(_candidate_ids_query(parse_address('Rue de la Loi 5A'), Language.FR, 45).compile(dialect=postgresql.dialect()))
+    order_by = statement.split('ORDER BY', 1)[1].split('LIMIT', 1)[0]
+
+    assert order_by.index('DESC') < order_by.index('lower(urbis_parcel_building.address.police_number) =') < order_by.index('address.id')
+
+
+def address_result(id: int, police_number: str, street_name_french='Rue de la Loi', street_name_dutch='Wetstraat',
+                   postal_code=1000, box_number=None, municipality_name_french='Bruxelles', municipality_name_dutch='Brussel'):
+    from app.schemas import responses
+
+    return responses.AddressResult(
+        id=id, address_id=id, street_name_dutch=street_name_dutch, street_name_french=street_name_french,
+        police_number=police_number, box_number=box_number, postal_code=postal_code,
+        municipality_name_dutch=municipality_name_dutch, municipality_name_french=municipality_name_french, building_id=id * 10,
+    )
+
+
+def test_score_candidates_rewards_each_matching_field():
+    from app.parsers.address import parse_address, score_candidates
+
+    parsed = parse_address('Rue de la Loi 16 bte 2, 1000 Bruxelles')
+    candidates = [
+        address_result(1, '16', box_number='2'),
+        address_result(2, '16'),
+        address_result(3, '17', box_number='2'),
+        address_result(4, '19', box_number='2'),
+        address_result(5, '30', box_number='2'),
+        address_result(6, '16', box_number='2', postal_code=1040, municipality_name_french='Etterbeek', municipality_name_dutch='Etterbeek'),
+        address_result(7, '16', box_number='2', street_name_french='Rue Royale', street_name_dutch='Koningsstraat'),
+    ]
+
+    scores = score_candidates(candidates, parsed)
+
+    assert scores.shape == (len(candidates),)
+    # Exact number and box, then without the box, then the number proximity (1 apart, up to 3 apart, further)
+    assert scores[0] == pytest.approx(1.0)
+    assert scores[0] - scores[1] == pytest.approx(0.05)
+    assert scores[0] - scores[2] == pytest.approx(0.15 - 0.05)
+    assert scores[0] - scores[3] == pytest.approx(0.15 - 0.03)
+    assert scores[0] - scores[4] == pytest.approx(0.15)
+    # Postal code and municipality bonuses
+    assert scores[0] - scores[5] == pytest.approx(0.10 + 0.15)
+    # The street similarity dominates
+    assert scores[6] < scores[4]
+
+
+def test_score_candidates_takes_the_best_of_both_languages():
+    from app.parsers.address import parse_address, score_candidates
+
+    candidates = [address_result(1, '16')]
+
+    french = score_candidates(candidates, parse_address('Rue de la Loi 16'))
+    dutch = score_candidates(candidates, parse_address('Wetstraat 16'))
+
+    assert french == pytest.approx(dutch)
+
+
+def test_best_match_and_rank_similar_share_the_scores():
+    from app.parsers.address import AddressResultBatch, best_match, parse_address, rank_similar, score_candidates
+
+    parsed = parse_address('Rue de la Loi 16')
+    candidates = AddressResultBatch.from_results([address_result(1, '19'), address_result(2, '16'), address_result(3, '17')])
+    scores = score_candidates(candidates, parsed)
+
+    assert best_match(candidates, parsed, scores=scores).id == 2
+    assert [result.id for result in rank_similar(candidates, parsed, topk=2, scores=scores)] == [2, 3]
+    assert best_match(candidates, parsed, threshold=2.0, scores=scores) is None
+    assert best_match([], parsed) is None
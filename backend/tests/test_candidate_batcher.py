@@ -0,0 +1,114 @@
+import asyncio
+import collections
+
+import pytest
+
+from app.enums.language import Language
+from app.parsers.address import _ADDRESS_RESULT_COLUMNS, CandidateBatcher, parse_address
+
+
+Row = collections.namedtuple('Row', ['batch_index', *[column.key for column in _ADDRESS_RESULT_COLUMNS], 'similarity'])
+
+def candidate_row(batch_index: int, address_id: int) -> Row:
+    return Row(batch_index, address_id, address_id, 'Wetstraat', 'Rue de la Loi', '1', None, 1000, 'Brussel', 'Bruxelles', None, 0.9)
+
+
+class FakeSession:
+    def __init__(self, database):
+        self.database = database
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def execute(self, statement):
+        self.database.statements.append(statement)
+        self.database.running += 1
+        self.database.max_running = max(self.database.max_running, self.database.running)
+        try:
+            await asyncio.sleep(self.database.delay)
+            if self.database.error is not None:
+                raise self.database.error
+            return list(self.database.rows)
+        finally:
+            self.database.running -= 1
+
+
+class FakeDatabase:
+    """Session factory of the batcher: records the statements, answers with `rows` (whatever they asked for)."""
+    def __init__(self, rows=(), error=None, delay=0.0):
+        self.rows = rows
+        self.error = error
+        self.delay = delay
+        self.statements = []
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self):
+        return FakeSession(self)
+
+
+def union_branches(statement) -> int:
+    return str(statement).count('UNION ALL') + 1
+
+
+async def fetch_all(batcher: CandidateBatcher, free_texts: list[str]):
+    try:
+        return await asyncio.gather(*[
+            batcher.fetch(parse_address(free_text), Language.FR, limit_each=10) for free_text in free_texts
+        ], return_exceptions=True)
+    finally:
+        await batcher.close()
+
+
+def test_requests_are_demultiplexed_on_their_batch_index():
+    # Out of order on purpose: rows are dispatched on their batch index, not on their position
+    database = FakeDatabase(rows=[candidate_row(2, 30), candidate_row(0, 10), candidate_row(1, 20), candidate_row(0, 11)])
+    batcher = CandidateBatcher(database, batch_window_ms=5, max_batch_size=32, max_running_batches=4)
+
+    results = asyncio.run(fetch_all(batcher, ['Rue de la Loi 1', 'Rue de la Loi 2', 'Rue de la Loi 3']))
+
+    # Queued before the collector first ran, so sent together right away
+    assert len(database.statements) == 1
+    assert [candidates.id for candidates, _ in results] == [(10, 11), (20,), (30,)]
+
+
+def test_batches_are_padded_to_a_power_of_two():
+    database = FakeDatabase()
+    batcher = CandidateBatcher(database, batch_window_ms=5, max_batch_size=32, max_running_batches=4)
+
+    asyncio.run(fetch_all(batcher, [f'Rue de la Loi {i}' for i in range(1, 6)]))
+
+    assert [union_branches(statement) for statement in database.statements] == [8]
+
+
+def test_padding_stops_at_the_largest_batch():
+    database = FakeDatabase()
+    batcher = CandidateBatcher(database, batch_window_ms=5, max_batch_size=6, max_running_batches=4)
+
+    asyncio.run(fetch_all(batcher, [f'Rue de la Loi {i}' for i in range(1, 6)]))
+
+    assert [union_branches(statement) for statement in database.statements] == [6]
+
+
+def test_errors_reach_every_request_of_the_batch():
+    database = FakeDatabase(error=RuntimeError('connection lost'))
+    batcher = CandidateBatcher(database, batch_window_ms=5, max_batch_size=32, max_running_batches=4)
+
+    results = asyncio.run(fetch_all(batcher, ['Rue de la Loi 1', 'Rue de la Loi 2']))
+
+    assert len(database.statements) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_running_batches_are_capped():
+    database = FakeDatabase(delay=0.01)
+    batcher = CandidateBatcher(database, batch_window_ms=0, max_batch_size=1, max_running_batches=2)
+
+    results = asyncio.run(fetch_all(batcher, [f'Rue de la Loi {i}' for i in range(1, 7)]))
+
+    assert len(database.statements) == 6
+    assert database.max_running == 2
+    assert not any(isinstance(result, Exception) for result in results)
@@ -0,0 +1,83 @@
+import asyncio
+
+import shapely
+
+from app.core.constants import LAMBERT_72_SRID
+from app.enums.building_face_type import BuildingFaceType
+from app.enums.inspire_base_uri import InspireBaseURI
+
+
+FACES = [
+    # id, face id, solid id, type, WKT
+    (1, 11, 100, 'GROUNDSURFACE', 'MULTIPOLYGON Z (((0 0 10, 4 0 10, 4 2 10, 0 2 10, 0 0 10)))'),
+    (2, 12, 100, 'WALLSURFACE', 'MULTIPOLYGON Z (((0 0 10, 4 0 10, 4 0 20, 0 0 20, 0 0 10)))'),
+    (3, 13, 200, 'ROOFSURFACE', 'MULTIPOLYGON Z (((10 10 30, 12 10 30, 12 12 30, 10 12 30, 10 10 30)))'),
+]
+
+
+def build_3d_construction(geopackage):
+    from app.core.settings import Settings
+
+    geopackage(
+        Settings.URBIS_3D_CONSTRUCTION_GEO_PACKAGE_PATH, 'BuildingFaces',
+        ['INSPIRE_ID TEXT', 'BUSOLID_ID TEXT', 'TYPE TEXT', 'DETAILSLEVEL INTEGER', 'BEGINLIFE DATE', 'ENDLIFE DATE'],
+        'MULTIPOLYGON', LAMBERT_72_SRID,
+        [
+            (face_id, shapely.from_wkt(wkt), f'{InspireBaseURI.BUILDING_FACE.value}{inspire_id}', f'{InspireBaseURI.BUILDING_SOLID.value}{solid_id}', face_type, 2, '2020-01-01', None)
+            for face_id, inspire_id, solid_id, face_type, wkt in FACES
+        ],
+        has_z=True,
+    )
+
+
+def test_read_building_faces_yields_wkb(geopackage, spatialite):
+    build_3d_construction(geopackage)
+    from app.parsers import urbis_3d_construction
+
+    building_solids = {}
+    records = list(urbis_3d_construction.read_building_faces(building_solids))
+
+    assert [record[:2] for record in records] == [(face_id, inspire_id) for face_id, inspire_id, *_ in FACES]
+    for record, (_, _, solid_id, face_type, wkt) in zip(records, FACES):
+        geometry = record[urbis_3d_construction.BUILDING_FACE_COLUMNS.index('geometry')]
+        # Raw EWKB, as read by PostGIS' geometry_recv in a binary COPY
+        assert isinstance(geometry, bytes)
+        assert shapely.equals(shapely.from_wkb(geometry), shapely.from_wkt(wkt))
+        assert shapely.get_srid(shapely.from_wkb(geometry)) == LAMBERT_72_SRID
+        assert record[3] == solid_id
+        assert record[4] == BuildingFaceType[face_type].value
+
+    assert set(building_solids) == {100, 200}
+    assert shapely.equals(building_solids[100].geometry, shapely.Point(2, 1, 10))
+    assert building_solids[200].geometry is None
+
+
+def test_load_building_faces_with_binary_copy(geopackage, spatialite, postgis_url):
+    build_3d_construction(geopackage)
+    from app.core.database import async_engine
+    from app.core.models import BuildingFaceTMP
+    from app.parsers import urbis_3d_construction
+    from app.routers.bulk_load import bulk_copy_records
+    from sqlalchemy import func, select, text
+
+    async def load():
+        try:
+            async with async_engine.connect() as conn:
+                transaction = await conn.begin()
+                await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS {BuildingFaceTMP.__table__.schema}'))
+                await conn.run_sync(lambda sync_conn: BuildingFaceTMP.__table__.create(sync_conn, checkfirst=True))
+                raw_conn = await conn.get_raw_connection()
+                count = await bulk_copy_records(BuildingFaceTMP, raw_conn, urbis_3d_construction.read_building_faces({}), urbis_3d_construction.BUILDING_FACE_COLUMNS)
+                areas = (await conn.execute(
+                    select(BuildingFaceTMP.id, func.ST_Area(BuildingFaceTMP.geometry)).order_by(BuildingFaceTMP.id)
+                )).all()
+                await transaction.rollback()
+                return count, areas
+        finally:
+            await async_engine.dispose()
+
+    count, areas = asyncio.run(load())
+
+    assert count == len(FACES)
+    # ST_Area is planar: the vertical wall has no area on the ground
+    assert [tuple(row) for row in areas] == [(1, 8.0), (2, 0.0), (3, 4.0)]
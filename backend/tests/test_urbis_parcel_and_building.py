@@ -0,0 +1,139 @@
+import pytest
+import shapely
+
+from app.core.constants import LAMBERT_72_SRID
+from app.enums.inspire_base_uri import InspireBaseURI
+
+
+BUILDINGS = [
+    # id, building id, block URI, WKT
+    (1, 10, f'{InspireBaseURI.BLOCK.value}5', 'MULTIPOLYGON(((150000 170000, 150010 170000, 150010 170010, 150000 170010, 150000 170000)))'),
+    (2, 20, InspireBaseURI.BLOCK.value, 'MULTIPOLYGON(((150100 170100, 150110 170100, 150110 170110, 150100 170100)))'),
+]
+CADASTRAL_PARCELS = [
+    # id, parcel id, capakey, municipality URI, WKT
+    (1, 30, '21001A0001/00A000', '21001', 'MULTIPOLYGON(((150000 170000, 150020 170000, 150020 170020, 150000 170020, 150000 170000)))'),
+    (2, 40, '21001A0002/00B000', ' ', None),
+]
+
+
+def build_parcel_and_building(geopackage):
+    from app.core.settings import Settings
+
+    geopackage(
+        Settings.URBIS_PARCEL_BUILDING_GEO_PACKAGE_PATH, 'Buildings',
+        ['INSPIRE_ID TEXT', 'BLOCK_ID TEXT', 'AREA REAL'],
+        'MULTIPOLYGON', LAMBERT_72_SRID,
+        [
+            (building_pk, shapely.from_wkt(wkt), f'{InspireBaseURI.BUILDING.value}{building_id}', block_uri, 100.0)
+            for building_pk, building_id, block_uri, wkt in BUILDINGS
+        ],
+    )
+    geopackage(
+        Settings.URBIS_PARCEL_BUILDING_GEO_PACKAGE_PATH, 'CadastralParcels',
+        ['CAPAKEY TEXT', 'TYPE TEXT', 'CADAST_DIV TEXT', 'MUNNISCODE TEXT', 'INSPIRE_ID TEXT', 'AREA FLOAT'],
+        'MULTIPOLYGON', LAMBERT_72_SRID,
+        [
+            (parcel_pk, shapely.from_wkt(wkt) if wkt is not None else None, capakey, 'PR', '21001', munnis_code, f'{InspireBaseURI.CADASTRAL_PARCEL.value}{parcel_id}', 400.0)
+            for parcel_pk, parcel_id, capakey, munnis_code, wkt in CADASTRAL_PARCELS
+        ],
+    )
+
+
+def assert_ewkb(geometry, wkt: str):
+    # Raw EWKB, as read by PostGIS' geometry_recv in a binary COPY
+    assert isinstance(geometry, bytes)
+    decoded = shapely.from_wkb(geometry)
+    assert shapely.equals(decoded, shapely.from_wkt(wkt))
+    assert shapely.get_srid(decoded) == LAMBERT_72_SRID
+
+
+def test_read_buildings_yields_wkb(geopackage, spatialite):
+    build_parcel_and_building(geopackage)
+    from app.parsers import urbis_parcel_and_building
+
+    records = list(urbis_parcel_and_building.read_buildings())
+
+    assert [record[:3] for record in records] == [(1, 10, 5), (2, 20, None)]
+    for record, (*_, wkt) in zip(records, BUILDINGS):
+        assert_ewkb(record[urbis_parcel_and_building.BUILDING_COLUMNS.index('geometry')], wkt)
+
+
+def test_read_cadastral_parcels_yields_wkb(geopackage, spatialite):
+    build_parcel_and_building(geopackage)
+    from app.parsers import urbis_parcel_and_building
+
+    capa_key_to_capa_inspire_id = {}
+    records = list(urbis_parcel_and_building.read_cadastral_parcels(capa_key_to_capa_inspire_id))
+
+    assert capa_key_to_capa_inspire_id == {b'21001A0001/00A000': 30, b'21001A0002/00B000': 40}
+    assert [record[:4] for record in records] == [(1, 30, 21001, 21001), (2, 40, 21001, None)]
+    geometry_index = urbis_parcel_and_building.CADASTRAL_PARCEL_COLUMNS.index('geometry')
+    assert_ewkb(records[0][geometry_index], CADASTRAL_PARCELS[0][-1])
+    assert records[1][geometry_index] is None
+
+
+@pytest.mark.parametrize('value, expected', [
+    (None, False),
+    (b'', False),
+    (b'   ', False),
+    (InspireBaseURI.ADDRESS.value.encode(), False),
+    (f'{InspireBaseURI.ADDRESS.value}123'.encode(), True),
+    (b'21001', True),
+])
+def test_is_valid_inspire_id(value, expected):
+    from app.parsers.urbis_parcel_and_building import is_valid_inspire_id
+
+    assert is_valid_inspire_id(value) is expected
+
+
+@pytest.mark.parametrize('reader, base_uri', [
+    ('read_address_id', InspireBaseURI.ADDRESS),
+    ('read_block_id', InspireBaseURI.BLOCK),
+    ('read_building_id', InspireBaseURI.BUILDING),
+    ('read_cadastral_parcel_id', InspireBaseURI.CADASTRAL_PARCEL),
+    ('read_municipality_id', InspireBaseURI.MUNICIPALITY),
+    ('read_street_name_id', InspireBaseURI.STREET_NAME),
+])
+def test_read_ids_slice_their_base_uri(reader, base_uri):
+    from app.parsers import urbis_parcel_and_building
+
+    assert getattr(urbis_parcel_and_building, reader)(f'{base_uri.value}4021'.encode()) == 4021
+
+
+def test_lambert_08_point_matches_pyproj():
+    from app.core.constants import LAMBERT_08_SRID
+    from app.parsers.urbis_parcel_and_building import lambert_08_point
+    from pyproj import Transformer
+
+    point = shapely.from_wkb(lambert_08_point(150000.0, 170000.0))
+
+    x, y = Transformer.from_crs(LAMBERT_72_SRID, LAMBERT_08_SRID, always_xy=True).transform(150000.0, 170000.0)
+    assert shapely.get_srid(point) == LAMBERT_08_SRID
+    assert (point.x, point.y) == pytest.approx((x, y))
+
+
+def test_lambert_08_point_keeps_coordinates_outside_brussels():
+    from app.parsers.urbis_parcel_and_building import lambert_08_point
+
+    # Already in Lambert 2008 (or bogus): not reprojected a second time
+    assert shapely.from_wkb(lambert_08_point(650000.0, 670000.0)).coords[0] == (650000.0, 670000.0)
+
+
+@pytest.mark.parametrize('value', [
+    # The hex EWKB of SpatiaLite, as str from SQLAlchemy or ASCII bytes from iter_rows
+    shapely.to_wkb(shapely.Point(150000, 170000), hex=True, include_srid=True),
+    shapely.to_wkb(shapely.Point(150000, 170000), hex=True, include_srid=True).encode(),
+])
+def test_read_geometry_unhexlifies(value):
+    from app.parsers.urbis_parcel_and_building import read_geometry
+
+    geometry = read_geometry(value)
+    assert isinstance(geometry, bytes)
+    assert shapely.equals(shapely.from_wkb(geometry), shapely.Point(150000, 170000))
+
+
+def test_read_geometry_keeps_none():
+    from app.parsers.urbis_parcel_and_building import read_geometry
+
+    assert read_geometry(None) is None